@@ -7,6 +7,8 @@
     Outputs: meteors
 """
 
+import argparse
+
 from core                   import asmodeus, logger
 from models                 import Population
 from utilities              import colour as c
@@ -19,8 +21,12 @@ class AsmodeusGenerate(asmodeus.AsmodeusMultiprocessing):
 
     def create_argparser(self):
         super().create_argparser()
-        self.argparser.add_argument('-c', '--count', type=int, help="override the total number of meteoroids to generate (only with random generator)")
+        self.argparser.add_argument('-c', '--count', type=int,
+                                    help="override the total number of meteoroids to generate (only with random and qmc generators)")
         self.argparser.add_argument('-s', '--streaks', action='store_true', help="Save observations as streaks (all frames will be recorded)")
+        self.argparser.add_argument('--shard', type=shard,
+                                    help="generate only the k-th of N contiguous slices of the grid, "
+                                         "as k/N with k from 0 to N - 1 (only with grid generator)")
 
     def override_config(self):
         super().override_config()
@@ -34,36 +40,73 @@ class AsmodeusGenerate(asmodeus.AsmodeusMultiprocessing):
             self.override_warning('streaks', self.config.streaks, self.args.streaks)
             self.config.streaks = True
 
+        self.config.shard = None
+        if self.args.shard:
+            self.override_warning('shard', self.config.shard, '/'.join(map(str, self.args.shard)))
+            self.config.shard = self.args.shard
+
     def prepare_dataset(self):
         self.dataset.reset_meteors()
 
     def configure(self):
         self.population = Population(self.config.generator, streaks = self.config.streaks)
+        if self.config.shard is not None:
+            self.population.generator.select_shard(*self.config.shard)
 
     def run_specific(self):
-        self.population.generate()
-
-        self.mark_time()
-        self.population.simulate(
-            self.config.integrator.fps,
-            self.config.integrator.spf,
+        adaptive = self.config.integrator.get('adaptive', None)
+        coast = self.config.integrator.get('coast', None)
+        gate = self.config.integrator.get('gate', None)
+        air = self.config.integrator.get('atmosphere', None)
+        altitude = self.config.integrator.get('altitude', None)
+        chunk = self.config.integrator.get('chunk', None)
+
+        options = dict(
             processes   = self.config.mp.processes,
             period      = self.config.mp.report,
+            batch       = self.config.integrator.get('batch', None),
+            jit         = self.config.integrator.get('jit', False),
+            adaptive    = None if adaptive is None else adaptive.toDict(),
+            coast       = None if coast is None else coast.toDict(),
+            gate        = None if gate is None else gate.toDict(),
+            air         = None if air is None else air.toDict(),
+            altitude    = None if altitude is None else altitude.toDict(),
         )
 
-        log.info("{num} meteors were generated in {time} seconds ({rate} meteors per second)".format(
-            num     = c.num(self.population.count),
-            time    = c.num(f"{self.stop_time():.6f}"),
-            rate    = c.num(f"{self.population.count / self.stop_time():.3f}"),
-        ))
+        if chunk is None:
+            self.population.generate()
 
         self.mark_time()
-        self.population.save(self.dataset, processes=self.config.mp.processes, period=self.config.mp.report)
+        if chunk is None:
+            self.population.simulate(self.config.integrator.fps, self.config.integrator.spf, **options)
+        else:
+            # Every chunk is generated, simulated and saved before the next one, the rate includes all three
+            self.population.stream(self.dataset, self.config.integrator.fps, self.config.integrator.spf, chunk=chunk, **options)
 
-        log.info("{num} meteors were saved to {dir} in {time} seconds ({rate} meteors per second)".format(
+        log.info("{num} meteors were generated in {time} seconds ({rate} meteors per second)".format(
             num     = c.num(self.population.count),
-            frames  = c.num(self.population.total_frames),
             time    = c.num(f"{self.stop_time():.6f}"),
             rate    = c.num(f"{self.population.count / self.stop_time():.3f}"),
-            dir     = c.path(self.dataset.path('meteors')),
         ))
+
+        if chunk is None:
+            self.mark_time()
+            self.population.save(self.dataset, processes=self.config.mp.processes, period=self.config.mp.report)
+
+            log.info("{num} meteors were saved to {dir} in {time} seconds ({rate} meteors per second)".format(
+                num     = c.num(self.population.count),
+                frames  = c.num(self.population.total_frames),
+                time    = c.num(f"{self.stop_time():.6f}"),
+                rate    = c.num(f"{self.population.count / self.stop_time():.3f}"),
+                dir     = c.path(self.dataset.path('meteors')),
+            ))
+
+
+def shard(text):
+    try:
+        index, count = map(int, text.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must be given as k/N, not {text}")
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 0 and {count - 1}, not {index}")
+    return index, count
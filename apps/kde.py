@@ -7,8 +7,8 @@ class AsmodeusKDE(asmodeus.AsmodeusAnalyze):
     name = 'kde'
 
     def prepare_dataset(self):
-        super().prepare_dataset()
-        self.protect_overwrite('analyses', 'kde')
+        self.dataset.reset_KDEs()
 
-    def run_analysis(self, observer):
-        observer.make_KDEs()
+    def run_specific(self):
+        super().run_specific()
+        self.campaign.make_KDEs()
@@ -44,7 +44,7 @@ class AsmodeusAnalyze(Asmodeus):
                 for discriminator in discriminators.values():
                     discriminator.log_info()
 
-                self.campaign.set_discriminators(discriminators)
+                self.campaign.set_discriminators(discriminators, seed=self.bias.get('seed'))
                 
             except AttributeError as e:
                 raise exceptions.ConfigurationError(e) from e
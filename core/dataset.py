@@ -82,6 +82,12 @@ class DataManager():
     def reset_sky_plots(self):
         self.protected_reset('analyses', 'skyplots')
 
+    def reset_histograms(self):
+        self.protected_reset('analyses', 'histograms')
+
+    def reset_KDEs(self):
+        self.protected_reset('analyses', 'kdes')
+
     def meteor_files(self):
         return self.list('meteors')
         
@@ -1,5 +1,4 @@
 import logging
-import time
 import multiprocessing as mp
 
 from utilities          import colour as c
@@ -8,22 +7,23 @@ log = logging.getLogger('root')
 
 
 def parallel(function, args, *, initializer = None, initargs = (), processes = 1, action = "<default action>", period = 1):
-    manager = mp.Manager()
-    queue = manager.Queue()
-    pool = mp.Pool(processes = processes, initializer = initializer, initargs = (queue, *initargs))
-    total = len(args)
-    chunksize = (total // processes)
+    # Pools are created for every call (once per chunk when streaming), so they must not outlive it
+    with mp.Manager() as manager:
+        queue = manager.Queue()
+        with mp.Pool(processes = processes, initializer = initializer, initargs = (queue, *initargs)) as pool:
+            return collect(pool.map_async(function, args, len(args) // processes), queue, len(args), action, period)
 
-    results = pool.map_async(function, args, chunksize)
 
+def collect(results, queue, total, action, period):
     while not results.ready():
         size = queue.qsize()
-        log.info("{action}: {count} of {total} ({perc})".format(
+        log.info("{action}: {count} of {total} ({perc})".format(
             action      = action,
             count       = c.num(f"{size:6d}"),
             total       = c.num(f"{total:6d}"),
             perc        = c.num(f"{size / total * 100:6.2f}%"),
         ))
-        time.sleep(period)
+        # Return as soon as the results are ready instead of sleeping for the full period
+        results.wait(period)
 
     return results.get()
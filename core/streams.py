@@ -0,0 +1,32 @@
+import logging
+import numpy as np
+
+from utilities          import colour as c
+
+log = logging.getLogger('root')
+
+
+STAGES = ('generate', 'bias', 'qmc')
+
+
+class Streams():
+    """
+        Independent NumPy random streams spawned from a single seed through SeedSequence.
+        Every stream is keyed by its stage and by the index of the chunk (or dataframe) it is used for,
+        never by the worker or by the order in which it is requested, so that a chunk draws the same numbers
+        in a serial run and in any shard of a parallel one. Without a seed, fresh entropy is drawn from the OS
+        and can be read back as `seed` to reproduce the run.
+    """
+    def __init__(self, seed=None):
+        self.seed = int(np.random.SeedSequence(seed).entropy)
+
+    def sequence(self, stage, *key):
+        return np.random.SeedSequence(self.seed, spawn_key=(STAGES.index(stage), *key))
+
+    def generator(self, stage, *key):
+        """ NumPy Generator for chunk `key` of `stage` """
+        return np.random.default_rng(self.sequence(stage, *key))
+
+    def log_info(self):
+        log.info(f"Random streams are seeded with {c.num(self.seed)}")
+        return self
@@ -1,11 +1,13 @@
 import logging
-import random
+import numpy as np
 
 from utilities      import colour as c, utilities as util
 from core           import exceptions
 
 log = logging.getLogger('root')
 
+DEFAULT_RNG = np.random.default_rng()
+
 
 class Discriminator():
     """
@@ -23,8 +25,9 @@ class Discriminator():
         except TypeError as e:
             raise exceptions.ConfigurationError(e)
 
-    def compute(self, value):
-        rnd = random.random()
+    def compute(self, value, rng=None):
+        """ Decide about a single value, drawing from the NumPy Generator `rng` (DEFAULT_RNG if None) """
+        rnd = (DEFAULT_RNG if rng is None else rng).random()
         prob = self.function(value)
         log.debug("{name:<25} {value}: random value {rnd}, threshold {prob} ({comment})".format(
             name    = c.param(self.property.capitalize()),
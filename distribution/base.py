@@ -1,6 +1,7 @@
-import random
 import logging
 import dotmap
+import numpy as np
+import scipy.special
 
 from core import exceptions
 from utilities import colour as c, utilities as u
@@ -8,16 +9,74 @@ from utilities import colour as c, utilities as u
 log = logging.getLogger('root')
 
 
+# Generator used when sample is not given one
+DEFAULT_RNG = np.random.default_rng()
+
+
+class Quantile():
+    """
+        A sampler given by its inverse CDF `transform`, which maps an n × `dimensions` array of points
+        in the unit cube to n values, so that the distribution can also be driven by a quasi-random sequence.
+        Called as f(n, rng) like any other sampler, using `sample` if given (usually a faster
+        or more exact NumPy method) or else the transform of uniform random points.
+    """
+    __slots__ = ('dimensions', 'transform', 'sample')
+
+    def __init__(self, dimensions, transform, sample=None):
+        self.dimensions     = dimensions
+        self.transform      = transform
+        self.sample         = sample
+
+    def __call__(self, n, rng):
+        if self.sample is None:
+            return self.transform(rng.random((n, self.dimensions)))
+        return self.sample(n, rng)
+
+
 class Distribution():
+    """
+        A named distribution of a quantity. `functions` maps names to factories that take the parameters
+        and return a vectorised sampler f(n, rng), drawing n values at once from a NumPy Generator.
+    """
     def __init__(self, name, **kwargs):
         self.name   = name
         self.params = kwargs
         try:
-            self.sample = self.functions.get(name)(**kwargs)
+            self.sampler = self.functions.get(name)(**kwargs)
         except TypeError:
             self.error_unknown(name)
             raise exceptions.ConfigurationError()
 
+    def sample(self, n=None, rng=None):
+        """
+            Draw `n` values from the NumPy Generator `rng` (DEFAULT_RNG if None) as an array.
+            Without `n`, draw a single value, unpacked by `item`.
+        """
+        rng = DEFAULT_RNG if rng is None else rng
+        if n is None:
+            return self.item(self.sampler(1, rng))
+        return self.sampler(n, rng)
+
+    def item(self, values):
+        """ Convert the first of sampled values to a Python scalar """
+        return float(values[0])
+
+    def quantile(self):
+        if not isinstance(self.sampler, Quantile):
+            raise exceptions.ConfigurationError(
+                f"{self.quantity.capitalize()} distribution {c.name(self.name)} has no inverse CDF and cannot be used with a quasi-random sequence"
+            )
+        return self.sampler
+
+    @property
+    def dimensions(self):
+        """ Number of uniform variables needed for one value """
+        return self.quantile().dimensions
+
+    def transform(self, points):
+        """ Map an n × dimensions array of points in the unit cube to n values through the inverse CDF """
+        return self.quantile().transform(points)
+
     @classmethod
     def from_config(cls, config):
         try:
@@ -33,16 +92,16 @@ class Distribution():
             ))
 
     @classmethod
-    def constant(self, *, value) -> (lambda: float):
-        return lambda: value
+    def constant(self, *, value) -> Quantile:
+        return Quantile(0, lambda u: np.full(len(u), value, dtype=float))
 
     @classmethod
-    def uniform(self, *, min, max) -> (lambda: float):
-        return lambda: random.uniform(min, max)
+    def uniform(self, *, min, max) -> Quantile:
+        return Quantile(1, lambda u: min + (max - min) * u[:, 0], lambda n, rng: rng.uniform(min, max, n))
 
     @classmethod
-    def gauss(cls, *, mean = 0, sigma = 1) -> (lambda: float):
-        return lambda: random.gauss(mean, sigma)
+    def gauss(cls, *, mean = 0, sigma = 1) -> Quantile:
+        return Quantile(1, lambda u: mean + sigma * scipy.special.ndtri(u[:, 0]), lambda n, rng: rng.normal(mean, sigma, n))
 
     @classmethod
     def default(cls, **kwargs):
@@ -17,9 +17,9 @@ class DensityDistribution(base.Distribution):
         super().__init__(name, **kwargs)
 
     @classmethod
-    def asteroidal(cls, **kwargs) -> (lambda: float):
-        return lambda: cls.gauss(3300, 50)
+    def asteroidal(cls, **kwargs) -> base.Quantile:
+        return cls.gauss(mean = 3300, sigma = 50)
 
     @classmethod
-    def iron(cls, **kwargs) -> (lambda: float):
-        return lambda: cls.gauss(7800, 30)
+    def iron(cls, **kwargs) -> base.Quantile:
+        return cls.gauss(mean = 7800, sigma = 30)
@@ -1,8 +1,9 @@
-import random
 import logging
 import numpy as np
 
+from core import exceptions
 from distribution import base
+from utilities import colour as c
 
 log = logging.getLogger('root')
 
@@ -17,18 +18,65 @@ class MassDistribution(base.Distribution):
             'constant':     self.__class__.constant,
         }
         super().__init__(name, **kwargs)
+        self.importance = None
 
     @classmethod
-    def pareto(cls, *, shape: float, minimum: float) -> (lambda: float):
-        return lambda: (np.random.pareto(shape - 1) + 1) * minimum
+    def from_config(cls, config):
+        distribution = super().from_config(config)
+        importance = config.get('importance', None)
+        if importance is not None:
+            distribution.use_proposal(**importance.toDict())
+        return distribution
+
+    def use_proposal(self, *, shape: float):
+        """
+            Importance sampling: draw from a flatter Pareto proposal with exponent `shape`
+            (between 1 and the shape of the target) instead, so that the rare heavy meteoroids are drawn
+            much more often, and compensate with the per-meteoroid weights returned by `weight`
+        """
+        if self.name != 'pareto':
+            raise exceptions.ConfigurationError(f"Importance sampling is only available for the {c.name('pareto')} mass distribution")
+        if not 1 < shape <= self.params['shape']:
+            raise exceptions.ConfigurationError(f"Proposal shape must be greater than 1 and at most {self.params['shape']}, not {shape}")
+
+        self.importance = {'shape': shape}
+        self.sampler = self.pareto(shape=shape, minimum=self.params['minimum'])
+        return self
+
+    def weight(self, masses):
+        """ Likelihood ratio of the target and proposal densities at `masses`, all ones without a proposal """
+        if self.importance is None:
+            return np.ones(len(masses))
+        target, proposal, minimum = self.params['shape'], self.importance['shape'], self.params['minimum']
+        return (target - 1) / (proposal - 1) * (masses / minimum)**(proposal - target)
+
+    def log_info(self):
+        super().log_info()
+        if self.importance is not None:
+            log.info(f"        drawn from a proposal with {c.param('shape')} = {self.importance['shape']} and weighted")
+        return self
+
+    def as_dict(self):
+        return {
+            **super().as_dict(),
+            **({} if self.importance is None else {'importance': self.importance}),
+        }
+
+    @classmethod
+    def pareto(cls, *, shape: float, minimum: float) -> base.Quantile:
+        return base.Quantile(
+            1,
+            lambda u: minimum * (1 - u[:, 0])**(-1 / (shape - 1)),
+            lambda n, rng: (rng.pareto(shape - 1, n) + 1) * minimum,
+        )
 
     @classmethod
-    def exponential(cls, *, shape: float) -> (lambda: float):
-        return lambda: np.random.exponential(shape)
+    def exponential(cls, *, shape: float) -> base.Quantile:
+        return base.Quantile(1, lambda u: -shape * np.log1p(-u[:, 0]), lambda n, rng: rng.exponential(shape, n))
 
     @classmethod
-    def power(cls, *, shape: float, minimum: float) -> (lambda: float):
-        return lambda: (minimum**(shape + 1) * random.random())**(1 / (shape + 1))
+    def power(cls, *, shape: float, minimum: float) -> base.Quantile:
+        return base.Quantile(1, lambda u: (minimum**(shape + 1) * u[:, 0])**(1 / (shape + 1)))
 
 # Maybe it is a good idea to do this with mixins
 """
@@ -41,6 +89,6 @@ class ParetoDistribution(base.Distribution, MassDistributionMixin):
         self.shape = shape
         self.minimum = minimum
 
-    def sample(self):
-        return (np.random.pareto(self.shape - 1) + 1) * self.minimum
+    def sample(self, n, rng):
+        return (rng.pareto(self.shape - 1, n) + 1) * self.minimum
 """
@@ -1,6 +1,5 @@
 import logging
-import random
-import math
+import numpy as np
 
 from distribution import base
 from physics import coord
@@ -19,23 +18,35 @@ class PositionDistribution(base.Distribution):
         }
         super().__init__(name, **kwargs)
 
+    def item(self, values):
+        return values[0]
+
     @classmethod
-    def constant(cls, *, latitude: float, longitude: float, elevation: float) -> (lambda: coord.Vector3D):
-        return lambda: coord.Vector3D.from_geodetic(latitude, longitude, elevation)
+    def constant(cls, *, latitude: float, longitude: float, elevation: float) -> base.Quantile:
+        position = coord.Vector3D.from_geodetic(latitude, longitude, elevation).as_numpy_vector()
+        return base.Quantile(0, lambda u: coord.Vector3DArray(np.tile(position, (len(u), 1))))
 
     @classmethod
-    def pillow(cls, *, south: float, north: float, west: float, east: float, bottom: float, top: float) -> (lambda: coord.Vector3D):
-        def fun():
-            southSin = math.sin(math.radians(south))
-            northSin = math.sin(math.radians(north))
-            latitude = math.degrees(math.asin(random.uniform(southSin, northSin)))
-            longitude = random.uniform(west, east)
-            elevation = random.uniform(bottom, top)
-            return coord.Vector3D.from_geodetic(latitude, longitude, elevation)
-        return fun
+    def pillow(cls, *, south: float, north: float, west: float, east: float, bottom: float, top: float) -> base.Quantile:
+        sin_south, sin_north = np.sin(np.radians(south)), np.sin(np.radians(north))
+
+        def transform(u):
+            # Uniform in the sine of latitude, so that the density per unit area is constant
+            latitude = np.degrees(np.arcsin(sin_south + (sin_north - sin_south) * u[:, 0]))
+            longitude = west + (east - west) * u[:, 1]
+            elevation = bottom + (top - bottom) * u[:, 2]
+            return coord.Vector3DArray.from_geodetic(latitude, longitude, elevation)
+
+        def fun(n, rng):
+            latitude = np.degrees(np.arcsin(rng.uniform(sin_south, sin_north, n)))
+            longitude = rng.uniform(west, east, n)
+            elevation = rng.uniform(bottom, top, n)
+            return coord.Vector3DArray.from_geodetic(latitude, longitude, elevation)
+
+        return base.Quantile(3, transform, fun)
 
     @classmethod
-    def circle(cls, *, latitude: float, longitude: float, radius: float, elevation: float) -> (lambda: coord.Vector3D):
-        def fun():
-            return coord.Vector3D.from_geodetic(0, 0, 0)  # Put real computation here
+    def circle(cls, *, latitude: float, longitude: float, radius: float, elevation: float) -> (lambda n, rng: coord.Vector3DArray):
+        def fun(n, rng):
+            return coord.Vector3DArray.from_geodetic(np.zeros(n), np.zeros(n), np.zeros(n))  # Put real computation here
         return fun
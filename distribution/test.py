@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+import unittest
+import datetime
+import numpy as np
+
+from core.streams import Streams
+from physics import coord
+from distribution import MassDistribution, PositionDistribution, VelocityDistribution, \
+    DensityDistribution, TimeDistribution, DragCoefficientDistribution
+
+
+class CaseSample(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(42)
+
+    def test_scalar_wrapper(self):
+        self.assertIsInstance(MassDistribution('pareto', shape=2.0, minimum=1e-6).sample(), float)
+        self.assertIsInstance(DensityDistribution('asteroidal').sample(), float)
+        self.assertIsInstance(DragCoefficientDistribution('uniform', min=0.5, max=1).sample(), float)
+        self.assertIsInstance(PositionDistribution('constant', latitude=48, longitude=17, elevation=1e5).sample(), coord.Vector3D)
+        self.assertIsInstance(VelocityDistribution('shower', ra=46, dec=58, speed=59000).sample(), coord.Vector3D)
+        self.assertIsInstance(TimeDistribution('constant', value=datetime.datetime(2016, 8, 12)).sample(), datetime.datetime)
+
+    def test_mass(self):
+        masses = MassDistribution('pareto', shape=2.0, minimum=1e-6).sample(100000, self.rng)
+        self.assertEqual(masses.shape, (100000,))
+        self.assertGreaterEqual(masses.min(), 1e-6)
+        # With shape 2, the fraction of masses above k times the minimum is 1 / k
+        self.assertAlmostEqual(np.mean(masses > 1e-5), 0.1, delta=0.005)
+
+    def test_importance(self):
+        distribution = MassDistribution('pareto', shape=2.0, minimum=1e-6).use_proposal(shape=1.2)
+        masses = distribution.sample(200000, self.rng)
+        weights = distribution.weight(masses)
+        self.assertAlmostEqual(np.mean(weights), 1, delta=0.02)
+        # The weighted fraction above 100 times the minimum matches the target, 1 / 100
+        self.assertAlmostEqual(np.sum(weights * (masses > 1e-4)) / len(masses), 0.01, delta=0.001)
+
+    def test_reproducible(self):
+        distribution = DensityDistribution('gauss', mean=1000, sigma=100)
+        np.testing.assert_array_equal(
+            distribution.sample(10, np.random.default_rng(1)), distribution.sample(10, np.random.default_rng(1))
+        )
+
+    def test_pillow(self):
+        positions = PositionDistribution('pillow', south=45, north=53, west=13, east=27, bottom=80000, top=120000).sample(1000, self.rng)
+        self.assertIsInstance(positions, coord.Vector3DArray)
+        for position in positions[:20]:
+            geodetic = position.to_geodetic()
+            self.assertTrue(45 <= geodetic.lat <= 53)
+            self.assertTrue(13 <= geodetic.lon <= 27)
+            self.assertTrue(80000 - 1e-6 <= geodetic.alt <= 120000 + 1e-6)
+
+    def test_velocity(self):
+        velocities = VelocityDistribution('shower', ra=46, dec=58, speed=59000).sample(3, self.rng)
+        np.testing.assert_allclose(velocities.norm(), 59000)
+        self.assertEqual(velocities[2], velocities[0])
+
+    def test_time(self):
+        begin, end = datetime.datetime(2016, 8, 12), datetime.datetime(2016, 8, 13)
+        times = TimeDistribution('uniform', begin=begin, end=end).sample(1000, self.rng)
+        self.assertEqual(times.dtype, np.dtype('datetime64[us]'))
+        self.assertTrue(np.all(times >= np.datetime64(begin)) and np.all(times < np.datetime64(end)))
+
+    def test_time_aware(self):
+        value = datetime.datetime(2016, 8, 12, 2, tzinfo=datetime.timezone(datetime.timedelta(hours=2)))
+        self.assertEqual(TimeDistribution('constant', value=value).sample(), datetime.datetime(2016, 8, 12))
+
+
+class CaseTransform(unittest.TestCase):
+    def test_dimensions(self):
+        self.assertEqual(MassDistribution('pareto', shape=2.0, minimum=1e-6).dimensions, 1)
+        self.assertEqual(VelocityDistribution('shower', ra=46, dec=58, speed=59000).dimensions, 0)
+        self.assertEqual(PositionDistribution('pillow', south=45, north=53, west=13, east=27, bottom=8e4, top=1.2e5).dimensions, 3)
+
+    def test_pareto_median(self):
+        masses = MassDistribution('pareto', shape=3.0, minimum=1e-6).transform(np.array([[0.0], [0.5]]))
+        np.testing.assert_allclose(masses, [1e-6, 1e-6 * np.sqrt(2)])
+
+    def test_gauss(self):
+        densities = DensityDistribution('gauss', mean=1000, sigma=100).transform(np.array([[0.5], [0.8413447460685429]]))
+        np.testing.assert_allclose(densities, [1000, 1100])
+
+    def test_pillow_corners(self):
+        distribution = PositionDistribution('pillow', south=45, north=53, west=13, east=27, bottom=80000, top=120000)
+        corners = distribution.transform(np.array([[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]]))
+        low, high = corners[0].to_geodetic(), corners[1].to_geodetic()
+        self.assertAlmostEqual(low.lat, 45, places=9)
+        self.assertAlmostEqual(high.lon, 27, places=9)
+        self.assertAlmostEqual(high.alt, 120000, delta=1e-6)
+
+    def test_time(self):
+        begin, end = datetime.datetime(2016, 8, 12), datetime.datetime(2016, 8, 13)
+        times = TimeDistribution('uniform', begin=begin, end=end).transform(np.array([[0.5]]))
+        self.assertEqual(times[0].item(), datetime.datetime(2016, 8, 12, 12))
+
+
+class CaseStreams(unittest.TestCase):
+    def setUp(self):
+        self.distribution = MassDistribution('pareto', shape=2.0, minimum=1e-6)
+
+    def test_keyed(self):
+        # A chunk draws the same values regardless of which other chunks were drawn before
+        first = Streams(7)
+        second = Streams(7)
+        second.generator('generate', 0).random(1000)
+        np.testing.assert_array_equal(
+            self.distribution.sample(10, first.generator('generate', 3)),
+            self.distribution.sample(10, second.generator('generate', 3)),
+        )
+
+    def test_independent(self):
+        streams = Streams(7)
+        self.assertFalse(np.array_equal(
+            streams.generator('generate', 0).random(10), streams.generator('generate', 1).random(10)
+        ))
+        self.assertFalse(np.array_equal(
+            streams.generator('generate', 0).random(10), streams.generator('bias', 0).random(10)
+        ))
+
+    def test_entropy(self):
+        streams = Streams()
+        np.testing.assert_array_equal(
+            streams.generator('bias', 1).random(10), Streams(streams.seed).generator('bias', 1).random(10)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,19 @@
-import random
 import logging
 import datetime
+import numpy as np
 
 from distribution import base
 
 log = logging.getLogger('root')
 
 
+def as_datetime64(value):
+    """ A datetime as numpy.datetime64[us], timezone-aware ones are converted to naive UTC """
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, 'us')
+
+
 class TimeDistribution(base.Distribution):
     quantity = 'temporal'
 
@@ -17,10 +24,20 @@ class TimeDistribution(base.Distribution):
         }
         super().__init__(name, **kwargs)
 
+    def item(self, values):
+        return values[0].item()
+
     @classmethod
     def constant(cls, *, value):
-        return lambda: value
+        value = as_datetime64(value)
+        return base.Quantile(0, lambda u: np.full(len(u), value, dtype='datetime64[us]'))
 
     @classmethod
     def uniform(cls, *, begin, end):
-        return lambda: begin + datetime.timedelta(seconds = random.uniform(0, (end - begin).total_seconds()))
+        begin, end = as_datetime64(begin), as_datetime64(end)
+        span = (end - begin) / np.timedelta64(1, 'us')
+        return base.Quantile(
+            1,
+            lambda u: begin + (span * u[:, 0]).astype('timedelta64[us]'),
+            lambda n, rng: begin + rng.uniform(0, span, n).astype('timedelta64[us]'),
+        )
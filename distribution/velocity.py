@@ -1,5 +1,6 @@
 import logging
 import math
+import numpy as np
 
 from distribution import base
 from physics import coord
@@ -16,10 +17,14 @@ class VelocityDistribution(base.Distribution):
         }
         super().__init__(name, **kwargs)
 
+    def item(self, values):
+        return values[0]
+
     @classmethod
     def shower(cls, *, ra, dec, speed):
-        return lambda: -coord.Vector3D(
+        velocity = -np.array([
             math.cos(math.radians(dec)) * math.cos(math.radians(ra)),
             math.cos(math.radians(dec)) * math.sin(math.radians(ra)),
             math.sin(math.radians(dec))
-        ) * speed
+        ]) * speed
+        return base.Quantile(0, lambda u: coord.Vector3DArray(np.tile(velocity, (len(u), 1))))
@@ -3,6 +3,7 @@ import yaml
 import datetime
 
 from core               import configuration, exceptions
+from core.streams       import Streams
 
 from models.observer    import Observer
 from models.observation import Observation
@@ -84,15 +85,17 @@ class Campaign():
             'observations':     {observation.observer.id: observation.as_dict() for observation in self.observations},
         }, open(self.dataset.path('campaign.yaml'), 'w'), default_flow_style = False)
 
-    def set_discriminators(self, discriminators):
+    def set_discriminators(self, discriminators, *, seed=None):
         self.discriminators = discriminators
-        self.bias_function = lambda row: all([disc.compute(row[prop]) for prop, disc in self.discriminators.items()])
+        self.streams = Streams(seed).log_info()
+        # Every discriminator draws for every row, so that the streams do not depend on earlier decisions
+        self.bias_function = lambda row, rng: all([disc.compute(row[prop], rng) for prop, disc in self.discriminators.items()])
 
     def filter_visible(self, bias = True):
         if bias:
             log.warning(f"Applying bias effects")
-            for dataframe in self.dataframes:
-                dataframe.apply_bias(self.bias_function)
+            for index, dataframe in enumerate(self.dataframes):
+                dataframe.apply_bias(self.bias_function, self.streams.generator('bias', index))
         else:
             log.warning(f"No bias effects active, all meteors will be visible")
             for dataframe in self.dataframes:
@@ -102,6 +105,14 @@ class Campaign():
         for dataframe in self.dataframes:
             dataframe.make_scatters(self.analyses.scatters)
 
+    def make_histograms(self):
+        for dataframe in self.dataframes:
+            dataframe.make_histograms()
+
+    def make_KDEs(self):
+        for dataframe in self.dataframes:
+            dataframe.make_KDEs()
+
     def make_sky_plots(self, *, dark = True):
         for dataframe in self.dataframes:
             dataframe.make_sky_plot(dark = dark)
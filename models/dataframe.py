@@ -1,12 +1,13 @@
 import logging
 import pandas
 import numpy as np
+import scipy.stats
 
-from astropy.time               import Time
 from matplotlib                 import pyplot, colors
 from matplotlib.ticker          import ScalarFormatter
 
 from models.sighting            import Sighting
+from physics                    import coord
 from utilities                  import colour as c
 
 log = logging.getLogger('root')
@@ -34,14 +35,27 @@ class Dataframe():
         log.info(f"Creating a dataframe from observation (observer {c.name(observation.observer.name)})")
         dataframe = Dataframe(observation.dataset, observation.observer)
         dataframe.data = pandas.DataFrame.from_records(
-            [frame.as_tuple() for sighting in observation.sightings for frame in sighting.frames],
+            [(*frame.as_tuple(), sighting.meteor.id, sighting.weight) for sighting in observation.sightings for frame in sighting.frames],
             columns     = Sighting.columns,
         )
+        dataframe.data['timestamp'] = cls.timestamps(dataframe.data.timestamp, dataframe.data.time)
         log.info(f"Dataframe created with {c.num(len(dataframe.data.index))} rows")
         return dataframe
 
+    @staticmethod
+    def timestamps(epochs, times):
+        """ Format absolute timestamps from trajectory epochs and float offsets in seconds, rounded to microseconds """
+        epochs = np.asarray(epochs, dtype='datetime64[us]')
+        offsets = np.round(np.asarray(times, dtype=float) * 1e6).astype('timedelta64[us]')
+        return np.datetime_as_string(epochs + offsets, unit='us')
+
     def expand(self):
-        self.data['mjd'] = Time(self.data.timestamp.to_numpy(dtype = 'datetime64[ns]')).mjd
+        # Sightings saved before importance sampling: every row is a separate meteor of unit weight
+        if 'meteor' not in self.data:
+            self.data['meteor'] = self.data.index.astype(str)
+        if 'weight' not in self.data:
+            self.data['weight'] = 1.0
+        self.data['mjd'] = coord.julian_date(self.data.timestamp.to_numpy(dtype = 'datetime64[ns]')) - 2400000.5
         self.data['mass_fraction'] = self.data.mass / self.data.mass_initial
         self.data['fpkgi'] = self.data.luminous_power / self.data.mass_initial
         self.data['fpkg'] = self.data.luminous_power / self.data.mass
@@ -52,13 +66,18 @@ class Dataframe():
 
         log.info(f"Saved a TSV file for observer {c.name(self.observer.name)} {c.path(filename)}")
 
-    def apply_bias(self, bias_function):
+    def apply_bias(self, bias_function, rng=None):
         log.info(f"Applying bias DPFs on dataframe for observer {c.name(self.observer.name)}")
 
-        self.data['visible'] = self.data.apply(bias_function, axis = 1)
+        self.data['visible'] = self.data.apply(lambda row: bias_function(row, rng), axis = 1)
         self.visible = self.data[(self.data.visible) & (self.data.altitude > self.observer.horizon)]
 
-        log.info(f"Bias applied, {c.num(len(self.visible.index))}/{c.num(len(self.data.index))} sightings marked as detected")
+        # A meteor is detected if any of its frames is, and counts once with its importance sampling weight
+        detected = self.visible.groupby('meteor').weight.first()
+        total = self.data.groupby('meteor').weight.first()
+        log.info(f"Bias applied, {c.num(len(self.visible.index))}/{c.num(len(self.data.index))} sightings marked as detected, "
+                 f"{c.num(len(detected))}/{c.num(len(total))} meteors "
+                 f"(weighted fraction {c.num(f'{detected.sum() / total.sum():.2%}')})")
 
     def skip_bias(self):
         self.visible = self.data#[self.data.altitude > self.observer.horizon]
@@ -138,12 +157,14 @@ class Dataframe():
             axes.set_yscale(yscale)
             axes.set_title(f"{self.observer.name} – {scatter.x.name} × {scatter.y.name}", fontdict = {'fontsize': 14})
 
+            # Marker area is proportional to the importance sampling weight, relative to the mean so that unweighted plots do not change
+            weight = self.visible.weight / self.visible.weight.mean()
             sc = axes.scatter(
                 self.visible[scatter.x.id],
                 self.visible[scatter.y.id],
                 c           = self.visible[scatter.colour.id],
                 #s           = 30000 / np.log10(self.visible.mass_initial)**4,
-                s           = 0.5 * np.exp(-self.visible.absolute_magnitude / 10) * (1 + self.visible.is_abs_brightest * 8),
+                s           = 0.5 * np.exp(-self.visible.absolute_magnitude / 10) * (1 + self.visible.is_abs_brightest * 8) * weight,
                 cmap        = scatter.get('cmap', 'viridis_r'),
                 alpha       = 1,
                 linewidths  = 0,
@@ -161,6 +182,64 @@ class Dataframe():
         except KeyError as e:
             log.error(f"Invalid scatter configuration parameter {c.param(e)}")
 
+    def make_histograms(self):
+        log.info(f"Creating {c.name('histograms')} for observer {c.name(self.observer.name)}, {c.num(len(self.visible.index))} frames to process")
+        self.dataset.create('analyses', 'histograms', self.observer.id, exist_ok = True)
+
+        for stat, params in self.quantities.items():
+            if stat in self.visible:
+                self.make_histogram(stat, params)
+            else:
+                log.debug(f"No column {c.param(stat)} in the dataframe, skipping its histogram")
+
+    def make_histogram(self, stat, params):
+        log.info(f"Creating a histogram for {c.param(stat)}")
+        hist, edges = self.compute_histogram(stat, params)
+
+        figure, axes = self.empty_figure()
+        axes.bar(edges[:-1], hist, width = params.bin, alpha = 0.5, align = 'edge', color = (0.1, 0.7, 0.4, 0.5), edgecolor = (0.1, 0.3, 0.2, 1))
+        axes.set_xlabel(params.name)
+        axes.set_ylabel('relative count')
+        figure.savefig(self.dataset.path('analyses', 'histograms', self.observer.id, f"{stat}.png"))
+        pyplot.close(figure)
+
+        np.savetxt(
+            self.dataset.path('analyses', 'histograms', self.observer.id, f"{stat}.tsv"),
+            np.vstack((edges[:-1], hist)).T,
+            delimiter       = '\t',
+            fmt             = ('%.10f', '%.10f'),
+        )
+
+    def compute_histogram(self, stat, params):
+        """ Density histogram of `stat` over visible frames, every frame weighted by the importance sampling weight of its meteor """
+        count = int(np.ceil((params.max - params.min) / params.bin))
+        bins = np.linspace(params.min, params.max, count + 1)
+        return np.histogram(self.visible[stat], bins = bins, weights = self.visible.weight, density = True)
+
+    def make_KDEs(self):
+        log.info(f"Creating {c.name('KDEs')} for observer {c.name(self.observer.name)}, {c.num(len(self.visible.index))} frames to process")
+        self.dataset.create('analyses', 'kdes', self.observer.id, exist_ok = True)
+
+        for stat, params in self.quantities.items():
+            if stat in self.visible:
+                self.render_KDE(stat, params)
+            else:
+                log.debug(f"No column {c.param(stat)} in the dataframe, skipping its KDE")
+
+    def compute_KDE(self, stat):
+        return scipy.stats.gaussian_kde(self.visible[stat], weights = self.visible.weight)
+
+    def render_KDE(self, stat, params):
+        log.info(f"Creating a KDE for {c.param(stat)}")
+        space = np.linspace(params.min, params.max, int(20 * (params.max - params.min) // params.bin))
+        pdf = self.compute_KDE(stat).evaluate(space)
+
+        figure, axes = self.empty_figure()
+        axes.fill_between(space, 0, pdf, alpha = 0.5)
+        axes.set_xlabel(params.name)
+        figure.savefig(self.dataset.path('analyses', 'kdes', self.observer.id, f"{stat}.png"))
+        pyplot.close(figure)
+
     def make_sky_plot(self, *, dark=True):
         log.info(f"Creating {c.name('sky plot')} for observer {c.name(self.observer.name)}, {c.num(len(self.visible.index))} frames to process")
 
@@ -1,20 +1,138 @@
-import copy
+from physics import coord
 
 
 class Frame:
-    def __init__(self, meteor):
-        self.timestamp          = meteor.timestamp
-        self.time               = meteor.time
-        self.position           = copy.copy(meteor.position)
-        self.velocity           = copy.copy(meteor.velocity)
-        self.speed              = self.velocity.norm()
-        self.luminous_power     = meteor.luminous_power
-        self.absolute_magnitude = meteor.absolute_magnitude
-        self.mass               = meteor.mass
-        self.mass_initial       = meteor.mass_initial
-        self.density            = meteor.density
-        self.ablation_heat      = meteor.ablation_heat
-        self.velocity_altaz     = meteor.velocity_altaz
+    """
+        A view of a single frame of a models.trajectory.Trajectory: nothing is copied,
+        all quantities are read from the trajectory's (raw or derived) columns on access
+    """
+    __slots__ = ('trajectory', 'index')
+
+    def __init__(self, trajectory, index):
+        self.trajectory         = trajectory
+        self.index              = index
+
+    def get(self, column):
+        return float(self.trajectory.data[self.index, column])
+
+    @property
+    def time(self):
+        return self.get(self.trajectory.TIME)
+
+    @property
+    def timestamp(self):
+        return self.trajectory.timestamp(self.index)
+
+    @property
+    def position(self):
+        return coord.Vector3D(*map(float, self.trajectory.data[self.index, self.trajectory.X:self.trajectory.Z + 1]))
+
+    @property
+    def velocity(self):
+        return coord.Vector3D(*map(float, self.trajectory.data[self.index, self.trajectory.VX:self.trajectory.VZ + 1]))
+
+    @property
+    def speed(self):
+        return float(self.trajectory.speed[self.index])
+
+    @property
+    def velocity_altaz(self):
+        return coord.Vector3D(*map(float, self.trajectory.velocity_altaz[self.index]))
+
+    @property
+    def altitude(self):
+        return float(self.trajectory.altitude[self.index])
+
+    @property
+    def mass(self):
+        return self.get(self.trajectory.MASS)
+
+    @property
+    def mass_change(self):
+        return self.get(self.trajectory.MASS_CHANGE)
+
+    @property
+    def luminous_power(self):
+        return float(self.trajectory.luminous_power[self.index])
+
+    @property
+    def absolute_magnitude(self):
+        return float(self.trajectory.absolute_magnitude[self.index])
+
+    @property
+    def air_density(self):
+        return float(self.trajectory.air_density[self.index])
+
+    @property
+    def mass_initial(self):
+        return self.trajectory.mass_initial
+
+    @property
+    def density(self):
+        return self.trajectory.density
+
+    @property
+    def ablation_heat(self):
+        return self.trajectory.ablation_heat
 
     def __str__(self):
-        return f"<MeteorFrame: {self.position}, {self.velocity:.0f} m/s, {self.velocity.norm():6.0f} m/s, {self.luminousPower:e} W>"
+        return f"<MeteorFrame: {self.position}, {self.velocity:.0f} m/s, {self.speed:6.0f} m/s, {self.luminous_power:e} W>"
+
+
+class FrameGate:
+    """
+        Decides which frames of a flight are worth keeping: only frames brighter than a floor,
+        given as an absolute magnitude and/or a luminous power, are kept together with
+        `margin` frames on either side of every bright run, and always the first and the last frame.
+        The gate is applied to the newest frame of a trajectory right after it has been appended,
+        so faint frames are removed as soon as they fall out of the margin.
+    """
+    def __init__(self, *, magnitude=None, power=None, margin=2):
+        self.magnitude          = magnitude
+        self.power              = power
+        self.margin             = margin
+
+        self.committed          = None
+        self.afterglow          = 0
+        self.seen               = 0
+        self.dropped            = 0
+
+    def bright(self, trajectory, index):
+        # Evaluated for a single frame, the derived columns are not computed during the flight
+        power = trajectory.luminous_power_at(index)
+        # A frame without any light has absolute magnitude -inf, but is certainly not visible
+        if not power > 0:
+            return False
+        if self.magnitude is not None and trajectory.absolute_magnitude_at(index) <= self.magnitude:
+            return True
+        return self.power is not None and power >= self.power
+
+    def discard(self, trajectory, count):
+        """ Remove the `count` oldest uncommitted frames """
+        if count > 0:
+            trajectory.remove(self.committed, self.committed + count)
+            self.dropped += count
+
+    def push(self, trajectory):
+        """ Decide about the last frame of `trajectory`, which has just been appended """
+        self.seen += 1
+        if self.committed is None:
+            # The first frame is always kept
+            self.committed = len(trajectory)
+            return
+
+        if self.bright(trajectory, len(trajectory) - 1):
+            self.discard(trajectory, len(trajectory) - 1 - self.committed - self.margin)
+            self.committed = len(trajectory)
+            self.afterglow = self.margin
+        elif self.afterglow > 0:
+            self.committed = len(trajectory)
+            self.afterglow -= 1
+        else:
+            # Keep the margin before a possible bright frame, and the newest frame as a possible last one
+            self.discard(trajectory, len(trajectory) - self.committed - max(self.margin, 1))
+
+    def close(self, trajectory):
+        """ Finish the flight: only the last of the uncommitted frames is kept """
+        if self.committed is not None:
+            self.discard(trajectory, len(trajectory) - self.committed - 1)
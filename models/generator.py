@@ -1,12 +1,14 @@
+import itertools
 import logging
-import random
 import dotmap
 import numbers
 import datetime
 import numpy as np
 import pandas
+import scipy.stats
 
 from core               import exceptions
+from core.streams       import Streams
 from distribution       import PositionDistribution, VelocityDistribution, MassDistribution, \
     DensityDistribution, TimeDistribution, DragCoefficientDistribution
 from models             import Meteor
@@ -23,14 +25,29 @@ class Generator():
         return {
             'grid':     GeneratorGrid,
             'random':   GeneratorRandom,
-        }[config.method](config.parameters)
+            'qmc':      GeneratorQMC,
+        }[config.method](config.parameters, seed=config.get('seed'))
+
+    def chunks(self, size=None):
+        """ Yield the meteoroids in lists of `size` (all at once if None), only the current list is kept """
+        raise NotImplementedError
+
+    def generate(self):
+        self.meteors = [meteor for chunk in self.chunks() for meteor in chunk]
+        return self.meteors
+
+    def select_shard(self, index, count):
+        raise exceptions.ConfigurationError(f"Sharding is only available for the {c.name('grid')} generator")
 
 
 class GeneratorGrid(Generator):
     method = 'grid'
 
-    def __init__(self, parameters):
+    def __init__(self, parameters, *, seed=None):
         self.parameters = parameters
+        self.grid       = self.get_grid()
+        self.indices    = range(len(self.grid))
+        self.shard      = None
 
     def get_space_range(self, *, min, max, count, spacing = 'linear', time = False):
         space = {
@@ -56,9 +73,8 @@ class GeneratorGrid(Generator):
         except TypeError as e:
             raise exceptions.ConfigurationError(e)
 
-    def generate(self):
-        self.meteors = []
-        space = utilities.dict_product(
+    def get_grid(self):
+        return utilities.DictGrid(
             mass                = self.get_space(self.parameters.mass),
 
             density             = self.get_space(self.parameters.material.density),
@@ -79,41 +95,56 @@ class GeneratorGrid(Generator):
             time                = self.get_space(self.parameters.time),
         )
 
-        for raw in space:
-            velocity_equatorial = VelocityDistribution.shower(ra = raw['ra'], dec = raw['dec'], speed = raw['speed'])()
-            velocity = coord.Vector3D.from_numpy_vector(
-                (coord.rot_matrix_z(coord.earth_rotation_angle(raw['time'])) @ velocity_equatorial.as_numpy_vector())
-            )
+    def select_shard(self, index, count):
+        """ Generate only the `index`-th of `count` contiguous slices of the grid """
+        self.indices    = self.grid.shard(index, count)
+        self.shard      = [index, count]
+        log.info(f"Grid shard {c.num(index)} of {c.num(count)}: points {c.num(self.indices.start)} to {c.num(self.indices.stop - 1)} "
+                 f"of {c.num(len(self.grid))}")
 
-            self.meteors.append(Meteor(
-                mass            = raw['mass'],
-                density         = raw['density'],
-                timestamp       = raw['time'],
-                position        = coord.Vector3D.from_geodetic(raw['latitude'], raw['longitude'], raw['elevation']),
-                drag_coefficient= raw['drag_coefficient'],
-                velocity        = velocity,
-                ablation_heat   = raw['ablation_heat'],
-            ))
-
-        self.count = len(self.meteors)
+    def chunks(self, size=None):
+        self.count = 0
         self.iterations = None
 
-        return self.meteors
+        meteors = (self.meteor(self.grid[index]) for index in self.indices)
+        while chunk := list(itertools.islice(meteors, size)):
+            self.count += len(chunk)
+            yield chunk
+
+    def meteor(self, raw):
+        velocity_equatorial = VelocityDistribution('shower', ra = raw['ra'], dec = raw['dec'], speed = raw['speed']).sample()
+        velocity = coord.Vector3D.from_numpy_vector(
+            (coord.rot_matrix_z(coord.earth_rotation_angle(raw['time'])) @ velocity_equatorial.as_numpy_vector())
+        )
+
+        return Meteor(
+            mass            = raw['mass'],
+            density         = raw['density'],
+            timestamp       = raw['time'],
+            position        = coord.Vector3D.from_geodetic(raw['latitude'], raw['longitude'], raw['elevation']),
+            drag_coefficient= raw['drag_coefficient'],
+            velocity        = velocity,
+            ablation_heat   = raw['ablation_heat'],
+        )
 
     def as_dict(self):
         return {
             'method':           self.method,
             'count':            self.count,
             'iterations':       None,
+            'shard':            self.shard,
             'parameters':       self.parameters.toDict(),
         }
 
 
 class GeneratorRandom(Generator):
     method  = 'random'
+    # Number of candidates drawn at once from one random stream
+    CHUNK   = 1 << 14
 
-    def __init__(self, parameters):
+    def __init__(self, parameters, *, seed=None):
         self.parameters = parameters
+        self.streams    = Streams(seed).log_info()
 
         self.mass_distribution              = MassDistribution.from_config(self.parameters.mass).log_info()
         self.position_distribution          = PositionDistribution.from_config(self.parameters.position).log_info()
@@ -122,41 +153,87 @@ class GeneratorRandom(Generator):
         self.temporal_distribution          = TimeDistribution.from_config(self.parameters.time).log_info()
         self.drag_coefficient_distribution  = DragCoefficientDistribution.from_config(self.parameters.shape.drag_coefficient).log_info()
 
-    def generate_one(self):
-        mass                    = self.mass_distribution.sample()
-        density                 = self.density_distribution.sample()
-        timestamp               = self.temporal_distribution.sample()
-        position                = self.position_distribution.sample()
-        drag_coefficient        = self.drag_coefficient_distribution.sample()
-        velocity_equatorial     = self.velocity_distribution.sample()
-
-        velocity_ECEF           = coord.Vector3D.from_numpy_vector(
-            (coord.rot_matrix_z(coord.earth_rotation_angle(timestamp)) @ velocity_equatorial.as_numpy_vector())
-        )
-        entry_angle_sin         = -position * velocity_ECEF / (position.norm() * velocity_ECEF.norm())
-
-        self.iterations += 1
-        if entry_angle_sin > random.random():
-            self.meteors.append(Meteor(
-                mass                = mass,
-                density             = density,
-                timestamp           = timestamp,
-                velocity            = velocity_ECEF,
-                position            = position,
-                ablation_heat       = self.parameters.material.ablation_heat,
-                heat_transfer       = self.parameters.material.heat_transfer,
-                drag_coefficient    = drag_coefficient,
-            ))
-            self.count += 1
-
-    def generate(self):
+    def sample_chunk(self, index):
+        """
+            Draw the CHUNK candidates of chunk `index` from its own random stream.
+            Returns the candidates as a dict of arrays, velocities still equatorial,
+            and the uniform variables for the entry angle acceptance test.
+        """
+        size = self.CHUNK
+        rng = self.streams.generator('generate', index)
+        candidates = {
+            'mass':                 self.mass_distribution.sample(size, rng),
+            'density':              self.density_distribution.sample(size, rng),
+            'timestamp':            self.temporal_distribution.sample(size, rng),
+            'position':             self.position_distribution.sample(size, rng),
+            'drag_coefficient':     self.drag_coefficient_distribution.sample(size, rng),
+            'velocity':             self.velocity_distribution.sample(size, rng),
+        }
+        return candidates, rng.random(size)
+
+    def generate_chunk(self, index):
+        """
+            Sample the candidates of chunk `index` and apply the entry angle acceptance test as a mask.
+            Returns the candidates as a dict of arrays and the indices of the accepted ones.
+        """
+        candidates, uniforms = self.sample_chunk(index)
+        velocity_equatorial = candidates['velocity']
+
+        # Rotation of every velocity about the z axis by the Earth rotation angle at its timestamp
+        cos, sin = coord.cos_sin(coord.earth_rotation_angle(candidates['timestamp']))
+        vx, vy, vz = velocity_equatorial.x, velocity_equatorial.y, velocity_equatorial.z
+        velocity = coord.Vector3DArray(np.stack((cos * vx - sin * vy, sin * vx + cos * vy, vz), axis=1))
+        candidates['velocity'] = velocity
+        candidates['weight'] = self.mass_distribution.weight(candidates['mass'])
+
+        position = candidates['position']
+        entry_angle_sin = -(position * velocity) / (position.norm() * velocity.norm())
+        return candidates, np.flatnonzero(entry_angle_sin > uniforms)
+
+    def chunks(self, size=None):
         log.info(f"Generating {c.num(self.parameters.count)} meteoroids")
+        size = self.parameters.count if size is None else size
         self.count = 0
         self.iterations = 0
-        self.meteors = []
-
-        while (self.count < self.parameters.count):
-            self.generate_one()
+        meteors = []
+
+        chunk = 0
+        while self.count < self.parameters.count:
+            remaining = self.parameters.count - self.count
+            candidates, accepted = self.generate_chunk(chunk)
+            chunk += 1
+
+            if len(accepted) >= remaining:
+                # Candidates after the last one needed are not counted, as if they were drawn one by one
+                accepted = accepted[:remaining]
+                self.iterations += int(accepted[-1]) + 1
+            else:
+                self.iterations += self.CHUNK
+
+            timestamps = candidates['timestamp'][accepted].tolist()
+            for index, timestamp in zip(accepted, timestamps):
+                meteors.append(Meteor(
+                    mass                = float(candidates['mass'][index]),
+                    density             = float(candidates['density'][index]),
+                    timestamp           = timestamp,
+                    velocity            = candidates['velocity'][index],
+                    position            = candidates['position'][index],
+                    ablation_heat       = self.parameters.material.ablation_heat,
+                    heat_transfer       = self.parameters.material.heat_transfer,
+                    drag_coefficient    = float(candidates['drag_coefficient'][index]),
+                    weight              = float(candidates['weight'][index]),
+                ))
+            self.count += len(accepted)
+
+            # Hand out full chunks by position, only the incomplete rest is carried over
+            start = 0
+            while len(meteors) - start >= size:
+                yield meteors[start:start + size]
+                start += size
+            del meteors[:start]
+
+        if meteors:
+            yield meteors
 
         log.info("Needed {iterations} candidate{s}, effective area {area}".format(
             iterations      = c.num(self.iterations),
@@ -164,13 +241,12 @@ class GeneratorRandom(Generator):
             s               = 's' if self.iterations > 1 else '',
         ))
 
-        return self.meteors
-
     def as_dict(self):
         return {
             'method': self.method,
             'count': self.count,
             'iterations': self.iterations,
+            'seed': self.streams.seed,
             'parameters': {
                 'mass': self.mass_distribution.as_dict(),
                 'time': self.temporal_distribution.as_dict(),
@@ -184,3 +260,57 @@ class GeneratorRandom(Generator):
                 },
             },
         }
+
+
+class GeneratorQMC(GeneratorRandom):
+    """
+        Same as GeneratorRandom, but every candidate is a point of a scrambled low-discrepancy sequence
+        over the joint parameter space, mapped through the inverse CDF of every distribution.
+        The last coordinate is the uniform variable of the entry angle acceptance test.
+        Chunk `index` is the `index`-th run of CHUNK consecutive points (a power of two, to keep the balance
+        of Sobol sequences), so chunks can still be drawn independently of each other.
+    """
+    method  = 'qmc'
+    ENGINES = {
+        'sobol':    scipy.stats.qmc.Sobol,
+        'halton':   scipy.stats.qmc.Halton,
+    }
+
+    def __init__(self, parameters, *, seed=None):
+        super().__init__(parameters, seed=seed)
+        self.sequence = self.parameters.get('sequence', 'sobol')
+        if self.sequence not in self.ENGINES:
+            raise exceptions.ConfigurationError(
+                f"Unknown quasi-random sequence {c.param(self.sequence)}, expected one of {utilities.format_list(self.ENGINES)}"
+            )
+
+        self.distributions = {
+            'mass':                 self.mass_distribution,
+            'density':              self.density_distribution,
+            'timestamp':            self.temporal_distribution,
+            'position':             self.position_distribution,
+            'drag_coefficient':     self.drag_coefficient_distribution,
+            'velocity':             self.velocity_distribution,
+        }
+        self.dimensions = sum(distribution.dimensions for distribution in self.distributions.values()) + 1
+        log.info(f"Candidates are drawn from a scrambled {c.name(self.sequence)} sequence in {c.num(self.dimensions)} dimensions")
+
+    def sample_chunk(self, index):
+        # Every chunk uses the same scrambling, so that together they form a single sequence
+        engine = self.ENGINES[self.sequence](self.dimensions, scramble=True, seed=self.streams.generator('qmc'))
+        if index > 0:
+            engine.fast_forward(index * self.CHUNK)
+        points = engine.random(self.CHUNK)
+
+        candidates = {}
+        start = 0
+        for name, distribution in self.distributions.items():
+            candidates[name] = distribution.transform(points[:, start:start + distribution.dimensions])
+            start += distribution.dimensions
+
+        return candidates, points[:, -1]
+
+    def as_dict(self):
+        result = super().as_dict()
+        result['parameters']['sequence'] = self.sequence
+        return result
@@ -0,0 +1,407 @@
+"""
+    Compiled flight kernel for Meteor.fly_constant and Meteor.fly_adaptive
+
+    Mirrors Meteor.evaluate, the constant-step integrators and the adaptive Dormand-Prince loop
+    on a flat float64[7] state (x, y, z, vx, vy, vz, log mass) and runs the entire trajectory in native code,
+    returning the frames as arrays. Numba is optional: without it the functions still work,
+    but as slow pure Python, so Meteor only uses the kernel when `AVAILABLE` is true.
+"""
+
+import math
+import numpy as np
+
+from physics import atmosphere, constants
+
+try:
+    import numba
+    AVAILABLE = True
+
+    def jit(function):
+        return numba.njit(cache=True)(function)
+except ImportError:
+    AVAILABLE = False
+
+    def jit(function):
+        return function
+
+
+METHODS = {
+    'euler':    0,
+    'RK4':      1,
+    'DP':       2,
+}
+
+MSIS_LOG_DENSITY = np.array(atmosphere.MSIS_LOG_DENSITY)
+
+TERMINAL_LOG_MASS = -18
+TERMINAL_SPEED = 1000
+EVENT_ITERATIONS = 48
+
+GM = constants.GRAVITATIONAL_CONSTANT * constants.EARTH_MASS
+OMEGA = constants.EARTH_ANGULAR_SPEED
+
+# WGS84 constants, see physics/wgs84.h
+WGS84_INVAA = 2.45817225764733181057e-14
+WGS84_EED2 = 3.34718999507065852867e-3
+WGS84_EEEE = 4.48147234524044602618e-5
+WGS84_EEEED4 = 1.12036808631011150655e-5
+WGS84_P1MEE = 9.93305620009858682943e-1
+WGS84_P1MEEDAA = 2.44171631847341700642e-14
+WGS84_INVCBRT2 = 7.93700525984099737380e-1
+
+# Dormand-Prince tableau rows, padded with zeros
+DP_A = np.array([
+    [0, 0, 0, 0, 0, 0],
+    [1 / 5, 0, 0, 0, 0, 0],
+    [3 / 40, 9 / 40, 0, 0, 0, 0],
+    [44 / 45, -56 / 15, 32 / 9, 0, 0, 0],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729, 0, 0],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656, 0],
+    [35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84],
+])
+
+# Difference between the fifth- and fourth-order weights, the last one belongs to the FSAL stage
+DP_E = np.array([
+    35 / 384 - 5179 / 57600, 0, 500 / 1113 - 7571 / 16695, 125 / 192 - 393 / 640,
+    -2187 / 6784 + 92097 / 339200, 11 / 84 - 187 / 2100, -1 / 40,
+])
+
+# Coefficients of the continuous extension, see Meteor.dense_output
+DP_D = np.array([
+    -12715105075 / 11282082432, 0, 87487479700 / 32700410799, -10690763975 / 1880347072,
+    701980252875 / 199316789632, -1453857185 / 822651844, 69997945 / 29380423,
+])
+
+# Components of the state sharing a tolerance: position, velocity and log mass
+TOLERANCE_GROUP = np.array([0, 0, 0, 1, 1, 1, 2])
+
+# Step size controller, see meteor.StepController
+CONTROL_BETA = 0.04
+CONTROL_ALPHA = 1 / 5 - 0.75 * CONTROL_BETA
+CONTROL_SAFETY = 0.9
+CONTROL_MIN_FACTOR = 0.2
+CONTROL_MAX_FACTOR = 10.0
+
+
+@jit
+def wgs84_altitude(x, y, z):
+    """ Osen's ECEF to WGS84 conversion reduced to the altitude, see physics/wgs84.c """
+    w_squared = x * x + y * y
+    m = w_squared * WGS84_INVAA
+    n = z * z * WGS84_P1MEEDAA
+    mpn = m + n
+    p = (mpn - WGS84_EEEE) / 6
+    G = m * n * WGS84_EEEED4
+    H = 2 * p * p * p + G
+    C = (H + G + 2 * math.sqrt(H * G))**(1 / 3) * WGS84_INVCBRT2
+    i = -WGS84_EEEED4 - 0.5 * mpn
+    beta = i / 3 - C - p * p / C
+    k = WGS84_EEEED4 * (WGS84_EEEED4 - mpn)
+    t4 = math.sqrt(math.sqrt(beta * beta - k) - 0.5 * (beta + i))
+    t6 = math.sqrt(abs(0.5 * (beta - i)))
+    t = t4 + t6 if m < n else t4 - t6
+    g = 2 * WGS84_EED2 * (m - n)
+    tt = t * t
+    t -= (tt * tt + 2 * i * tt + g * t + k) / (4 * tt * t + 4 * i * t + g)
+    u = t + WGS84_EED2
+    v = t - WGS84_EED2
+    w = math.sqrt(w_squared)
+    invuv = 1 / (u * v)
+    dw = w - w * v * invuv
+    dz = z - z * u * WGS84_P1MEE * invuv
+    da = math.sqrt(dw * dw + dz * dz)
+    return -da if u < 1 else da
+
+
+@jit
+def air_density(altitude, table):
+    """ Same as atmosphere.air_density_MSIS """
+    if altitude >= 500000:
+        return 0.0
+    if altitude < 0:
+        return 1.2175
+    i = int(altitude // 500)
+    f = (altitude - 500 * i) / 500
+    return math.exp(table[i] + (table[i + 1] - table[i]) * f) * 1000
+
+
+@jit
+def evaluate(state, diff, dt, out, shape_factor, density, heat_transfer, ablation_heat, table):
+    """ Kernel version of Meteor.evaluate, returns False instead of raising OverflowError """
+    x = state[0] + diff[0] * dt
+    y = state[1] + diff[1] * dt
+    z = state[2] + diff[2] * dt
+    vx = state[3] + diff[3] * dt
+    vy = state[4] + diff[4] * dt
+    vz = state[5] + diff[5] * dt
+    log_mass = state[6] + diff[6] * dt
+    if log_mass < -100:
+        return False
+
+    rho = air_density(wgs84_altitude(x, y, z), table)
+    speed = math.sqrt(vx * vx + vy * vy + vz * vz)
+    drag = shape_factor * rho * speed / (math.exp(log_mass / 3) * density**(2 / 3))
+    gravity = GM / math.sqrt(x * x + y * y + z * z)**3
+
+    out[0], out[1], out[2] = vx, vy, vz
+    out[3] = -drag * vx - gravity * x + 2 * OMEGA * vy + OMEGA * OMEGA * x
+    out[4] = -drag * vy - gravity * y - 2 * OMEGA * vx + OMEGA * OMEGA * y
+    out[5] = -drag * vz - gravity * z
+    out[6] = -(heat_transfer * shape_factor * rho * speed**3 * math.exp(-log_mass / 3) * density**(-2 / 3) / (2 * ablation_heat))
+    return True
+
+
+@jit
+def step(method, state, dt, stages, result, shape_factor, density, heat_transfer, ablation_heat, table):
+    """ One constant step of the selected method, the derivative is stored in `result` """
+    tmp = stages[7]
+    tmp[:] = 0
+
+    if method == 0:
+        return evaluate(state, tmp, dt, result, shape_factor, density, heat_transfer, ablation_heat, table)
+
+    if method == 1:
+        for j in range(4):
+            if j > 0:
+                tmp[:] = stages[j - 1] * (0.5 if j < 3 else 1.0)
+            if not evaluate(state, tmp, dt, stages[j], shape_factor, density, heat_transfer, ablation_heat, table):
+                return False
+        result[:] = (stages[0] + 2 * stages[1] + 2 * stages[2] + stages[3]) / 6
+        return True
+
+    return step_DP(state, dt, stages, result, False, shape_factor, density, heat_transfer, ablation_heat, table)
+
+
+@jit
+def step_DP(state, dt, stages, result, fsal, shape_factor, density, heat_transfer, ablation_heat, table):
+    """ Dormand-Prince stages into stages[0:6], with `fsal` set the first stage already holds the derivative at `state` """
+    tmp = stages[7]
+    for j in range(1 if fsal else 0, 6):
+        tmp[:] = 0
+        for k in range(j):
+            tmp += DP_A[j, k] * stages[k]
+        if not evaluate(state, tmp, dt, stages[j], shape_factor, density, heat_transfer, ablation_heat, table):
+            return False
+    result[:] = 0
+    for k in range(6):
+        result += DP_A[6, k] * stages[k]
+    return True
+
+
+@jit
+def terminate(state):
+    """ Same events as meteor.terminal_event, the altitude is only computed below the semi-major axis """
+    if state[6] < TERMINAL_LOG_MASS:
+        return True
+    if math.sqrt(state[3] * state[3] + state[4] * state[4] + state[5] * state[5]) < TERMINAL_SPEED:
+        return True
+    if (state[0] * state[0] + state[1] * state[1] + state[2] * state[2]) * WGS84_INVAA > 1:
+        return False
+    return wgs84_altitude(state[0], state[1], state[2]) < 0
+
+
+@jit
+def locate_event(state, diff, dt, scratch):
+    """ Same as Meteor.locate_event for a constant step, returns the fraction of the step at the event """
+    for j in range(7):
+        scratch[j] = state[j] + diff[j] * dt
+    if not terminate(scratch):
+        return 1.0
+
+    low, high = 0.0, 1.0
+    for _ in range(EVENT_ITERATIONS):
+        middle = (low + high) / 2
+        for j in range(7):
+            scratch[j] = state[j] + diff[j] * middle * dt
+        if terminate(scratch):
+            high = middle
+        else:
+            low = middle
+    return high
+
+
+@jit
+def dense_output(state, dt, theta, stages, solution, out):
+    """ Same as Meteor.dense_output, the FSAL stage is expected in stages[6] """
+    rest = 1 - theta
+    shape = theta * theta * rest * rest
+    first = theta * rest * rest + shape * DP_D[0]
+    last = -theta * theta * rest + shape * DP_D[6]
+    for j in range(7):
+        middle = DP_D[2] * stages[2, j] + DP_D[3] * stages[3, j] + DP_D[4] * stages[4, j] + DP_D[5] * stages[5, j]
+        out[j] = state[j] + dt * (
+            theta * (1 - rest + 2 * theta * rest) * solution[j] + first * stages[0, j] + shape * middle + last * stages[6, j]
+        )
+
+
+@jit
+def locate_event_dense(state, dt, stages, solution, scratch):
+    """ Same as Meteor.locate_event within an adaptive step, interpolated by the continuous extension """
+    dense_output(state, dt, 1.0, stages, solution, scratch)
+    if not terminate(scratch):
+        return 1.0
+
+    low, high = 0.0, 1.0
+    for _ in range(EVENT_ITERATIONS):
+        middle = (low + high) / 2
+        dense_output(state, dt, middle, stages, solution, scratch)
+        if terminate(scratch):
+            high = middle
+        else:
+            low = middle
+    return high
+
+
+@jit
+def reserve(times, states, diffs, count):
+    """ Return the frame arrays, doubled if they are full """
+    if count < len(times):
+        return times, states, diffs
+    capacity = 2 * len(times)
+    times_new, states_new, diffs_new = np.empty(capacity), np.empty((capacity, 7)), np.empty((capacity, 7))
+    times_new[:count], states_new[:count], diffs_new[:count] = times[:count], states[:count], diffs[:count]
+    return times_new, states_new, diffs_new
+
+
+@jit
+def fly_constant(initial, fps, spf, method, shape_factor, density, heat_transfer, ablation_heat, table):
+    """
+        Integrate an entire trajectory with a constant step, recording every spf-th step
+        Returns (times, states, diffs, final state, final time, step count), where the frame arrays
+        hold the state and its derivative at every recorded step, as passed to Meteor.save_snapshot
+    """
+    dt = 1.0 / (fps * spf)
+    state = initial.copy()
+    stages = np.empty((8, 7))
+    diff = np.empty(7)
+    scratch = np.empty(7)
+
+    times = np.empty(64)
+    states = np.empty((64, 7))
+    diffs = np.empty((64, 7))
+    count = 0
+
+    clock = 0
+    steps = 0
+    time = 0.0
+
+    while True:
+        if not step(method, state, dt, stages, diff, shape_factor, density, heat_transfer, ablation_heat, table):
+            break
+
+        if clock % spf == 0:
+            times, states, diffs = reserve(times, states, diffs, count)
+            times[count] = time
+            states[count] = state
+            diffs[count] = diff
+            count += 1
+        clock += 1
+
+        theta = locate_event(state, diff, dt, scratch)
+        for j in range(7):
+            state[j] += diff[j] * theta * dt
+        time += theta * dt
+        steps += 1
+
+        if theta < 1:
+            break
+
+    return times[:count], states[:count], diffs[:count], state, time, steps
+
+
+@jit
+def fly_adaptive(initial, fps, rtol, atol, dt_min, dt_max, shape_factor, density, heat_transfer, ablation_heat, table):
+    """
+        Integrate an entire trajectory with the adaptive Dormand-Prince 5(4) method, see Meteor.fly_adaptive.
+        Frames are sampled at exact 1 / fps instants from the continuous extension of every accepted step.
+        Returns (times, states, diffs, final state, final time, step count, rejected step count)
+    """
+    frame = 1.0 / fps
+    state = initial.copy()
+    # Stages 0-5 and the FSAL stage 6 of DP, 7 is scratch for step_DP
+    stages = np.empty((8, 7))
+    solution = np.empty(7)
+    zero = np.zeros(7)
+    dense = np.empty(7)
+    scratch = np.empty(7)
+
+    times = np.empty(64)
+    states = np.empty((64, 7))
+    diffs = np.empty((64, 7))
+    count = 0
+
+    time = 0.0
+    dt = min(frame, dt_max)
+    steps = 0
+    rejected = 0
+    previous_error = 1e-4
+    after_rejection = False
+
+    if not evaluate(state, zero, 0.0, stages[0], shape_factor, density, heat_transfer, ablation_heat, table):
+        return times[:0], states[:0], diffs[:0], state, time, steps, rejected
+    times[0], states[0], diffs[0] = 0.0, state, stages[0]
+    count = 1
+    frames = 1
+
+    while True:
+        h = dt
+        error = math.inf
+        if step_DP(state, h, stages, solution, True, shape_factor, density, heat_transfer, ablation_heat, table):
+            if evaluate(state, solution, h, stages[6], shape_factor, density, heat_transfer, ablation_heat, table):
+                total = 0.0
+                for j in range(7):
+                    estimate = DP_E[6] * stages[6, j]
+                    for k in range(6):
+                        estimate += DP_E[k] * stages[k, j]
+                    new = state[j] + solution[j] * h
+                    scale = atol[TOLERANCE_GROUP[j]] + rtol[TOLERANCE_GROUP[j]] * max(abs(state[j]), abs(new))
+                    total += (estimate * h / scale)**2
+                error = math.sqrt(total / 7)
+
+        if error > 1:
+            rejected += 1
+            after_rejection = True
+            if math.isinf(error):
+                dt = h * CONTROL_MIN_FACTOR
+            else:
+                dt = h * max(CONTROL_MIN_FACTOR, CONTROL_SAFETY * error**-CONTROL_ALPHA)
+            if dt < dt_min:
+                break
+            continue
+
+        theta = locate_event_dense(state, h, stages, solution, scratch)
+
+        # Record all frames that fall within the accepted step, or before the event within it
+        while frames * frame <= time + theta * h:
+            dense_output(state, h, (frames * frame - time) / h, stages, solution, dense)
+            times, states, diffs = reserve(times, states, diffs, count)
+            if evaluate(dense, zero, 0.0, diffs[count], shape_factor, density, heat_transfer, ablation_heat, table):
+                times[count] = frames * frame
+                states[count] = dense
+                count += 1
+            frames += 1
+
+        if theta < 1:
+            dense_output(state, h, theta, stages, solution, dense)
+            state[:] = dense
+            time += theta * h
+            steps += 1
+            break
+
+        for j in range(7):
+            state[j] += solution[j] * h
+        # First same as last: the derivative at the new state becomes the first stage of the next step
+        stages[0] = stages[6]
+
+        time += h
+        steps += 1
+        if error == 0:
+            factor = CONTROL_MAX_FACTOR
+        else:
+            factor = CONTROL_SAFETY * error**-CONTROL_ALPHA * previous_error**CONTROL_BETA
+        factor = min(1.0 if after_rejection else CONTROL_MAX_FACTOR, max(CONTROL_MIN_FACTOR, factor))
+        previous_error = max(error, 1e-4)
+        after_rejection = False
+        dt = min(h * factor, dt_max)
+
+    return times[:count], states[:count], diffs[:count], state, time, steps, rejected
@@ -1,14 +1,18 @@
 import datetime
 import logging
 import math
+import numbers
 import io
 import os
 import numpy as np
 import pickle
 
 import models.frame
+import models.trajectory
 
-from physics import atmosphere, coord, radiometry, constants
+from models import kernel
+
+from physics import atmosphere, coord, constants, wgs84
 
 log = logging.getLogger('root')
 class L():
@@ -51,58 +55,138 @@ DP_B5 = -92097/339200
 DP_B6 = 187/2100
 DP_B7 = 1/40
 
+# Coefficients of the continuous extension, Hairer, Nørsett & Wanner, dopri5
+DP_D1 = -12715105075/11282082432
+DP_D3 = 87487479700/32700410799
+DP_D4 = -10690763975/1880347072
+DP_D5 = 701980252875/199316789632
+DP_D6 = -1453857185/822651844
+DP_D7 = 69997945/29380423
+
 
 class State:
-    def __init__(self, position, velocity, log_mass):
-        self.position = position
-        self.velocity = velocity
+    """
+        Compact seven-component state of a meteoroid: position, velocity and log mass.
+        Arithmetic is done in place on scalar slots so that the steppers do not allocate.
+    """
+    __slots__ = ('x', 'y', 'z', 'vx', 'vy', 'vz', 'log_mass')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, vx=0.0, vy=0.0, vz=0.0, log_mass=0.0):
+        self.x, self.y, self.z = x, y, z
+        self.vx, self.vy, self.vz = vx, vy, vz
         self.log_mass = log_mass
 
+    @classmethod
+    def from_vectors(cls, position, velocity, log_mass):
+        return cls(position.x, position.y, position.z, velocity.x, velocity.y, velocity.z, log_mass)
+
+    @property
+    def position(self):
+        return coord.Vector3D(self.x, self.y, self.z)
+
+    @property
+    def velocity(self):
+        return coord.Vector3D(self.vx, self.vy, self.vz)
+
+    def speed(self):
+        return math.sqrt(self.vx * self.vx + self.vy * self.vy + self.vz * self.vz)
+
+    def set_advanced(self, state, diff, dt):
+        """ In-place self = state + diff * dt """
+        self.x = state.x + diff.dx * dt
+        self.y = state.y + diff.dy * dt
+        self.z = state.z + diff.dz * dt
+        self.vx = state.vx + diff.dvx * dt
+        self.vy = state.vy + diff.dvy * dt
+        self.vz = state.vz + diff.dvz * dt
+        self.log_mass = state.log_mass + diff.dm * dt
+        return self
+
+    def advance(self, diff, dt):
+        """ In-place self += diff * dt """
+        return self.set_advanced(self, diff, dt)
+
     def __str__(self):
         return f"{self.position:w} {self.velocity:s} {self.log_mass:6.3f}"
 
 
 class Diff:
-    def __init__(self, drdt, dvdt, dmdt):
-        self.drdt = drdt
-        self.dvdt = dvdt
-        self.dmdt = dmdt
+    """
+        Time derivative of a State. The steppers keep preallocated Diffs as scratch stages
+        and fill them in place with `set_scaled` and `set_combination`.
+        The allocating operators are kept for convenience outside of the integration loop.
+    """
+    __slots__ = ('dx', 'dy', 'dz', 'dvx', 'dvy', 'dvz', 'dm')
+
+    def __init__(self, dx=0.0, dy=0.0, dz=0.0, dvx=0.0, dvy=0.0, dvz=0.0, dm=0.0):
+        self.dx, self.dy, self.dz = dx, dy, dz
+        self.dvx, self.dvy, self.dvz = dvx, dvy, dvz
+        self.dm = dm
+
+    @classmethod
+    def from_vectors(cls, drdt, dvdt, dmdt):
+        return cls(drdt.x, drdt.y, drdt.z, dvdt.x, dvdt.y, dvdt.z, dmdt)
+
+    @property
+    def drdt(self):
+        return coord.Vector3D(self.dx, self.dy, self.dz)
+
+    @property
+    def dvdt(self):
+        return coord.Vector3D(self.dvx, self.dvy, self.dvz)
+
+    @property
+    def dmdt(self):
+        return self.dm
+
+    ### In-place fused arithmetics
+    def set_scaled(self, diff, number):
+        """ In-place self = diff * number """
+        self.dx = diff.dx * number
+        self.dy = diff.dy * number
+        self.dz = diff.dz * number
+        self.dvx = diff.dvx * number
+        self.dvy = diff.dvy * number
+        self.dvz = diff.dvz * number
+        self.dm = diff.dm * number
+        return self
+
+    def set_combination(self, *terms):
+        """ In-place self = sum(coefficient * diff for coefficient, diff in terms) """
+        (coefficient, diff), *rest = terms
+        self.set_scaled(diff, coefficient)
+        for coefficient, diff in rest:
+            self.dx += diff.dx * coefficient
+            self.dy += diff.dy * coefficient
+            self.dz += diff.dz * coefficient
+            self.dvx += diff.dvx * coefficient
+            self.dvy += diff.dvy * coefficient
+            self.dvz += diff.dvz * coefficient
+            self.dm += diff.dm * coefficient
+        return self
+
+    def assign(self, diff):
+        return self.set_scaled(diff, 1)
 
     ### Diff arithmetics
     def __add__(self, other):
-        return Diff(
-            self.drdt + other.drdt,
-            self.dvdt + other.dvdt,
-            self.dmdt + other.dmdt,
-        )
+        return Diff().set_combination((1, self), (1, other))
 
     def __sub__(self, other):
-        return Diff(
-            self.drdt - other.drdt,
-            self.dvdt - other.dvdt,
-            self.dmdt - other.dmdt,
-        )
+        return Diff().set_combination((1, self), (-1, other))
 
     def __mul__(self, number):
-        return Diff(
-            number * self.drdt,
-            number * self.dvdt,
-            number * self.dmdt,
-        )
+        return Diff().set_scaled(self, number)
 
     __rmul__ = __mul__
 
     def __truediv__(self, number):
-        return Diff(
-            self.drdt / number,
-            self.dvdt / number,
-            self.dmdt / number,
-        )
+        return Diff().set_scaled(self, 1 / number)
 
     ### Class methods
     @classmethod
     def zero(cls):
-        return Diff(coord.Vector3D(0, 0, 0), coord.Vector3D(0, 0, 0), 0)
+        return cls()
 
     ### Representations
     def __str__(self):
@@ -110,7 +194,101 @@ class Diff:
 
     ### Logic
     def norm(self):
-        return self.drdt.norm(), self.dvdt.norm(), self.dmdt**2
+        return (
+            math.sqrt(self.dx * self.dx + self.dy * self.dy + self.dz * self.dz),
+            math.sqrt(self.dvx * self.dvx + self.dvy * self.dvy + self.dvz * self.dvz),
+            self.dm**2,
+        )
+
+
+DIFF_ZERO = Diff()
+
+# Default tolerances of the adaptive integrator for (position [m], velocity [m/s], log mass)
+ADAPTIVE_RTOL = (0, 1e-6, 1e-6)
+ADAPTIVE_ATOL = (1, 1e-2, 1e-4)
+
+
+class StepController:
+    """
+        Proportional-integral step size controller for embedded Runge-Kutta methods
+        (Gustafsson 1991, in the form used by Hairer's DOPRI5)
+    """
+    def __init__(self, *, order=5, beta=0.04, safety=0.9, min_factor=0.2, max_factor=10):
+        self.alpha              = 1 / order - 0.75 * beta
+        self.beta               = beta
+        self.safety             = safety
+        self.min_factor         = min_factor
+        self.max_factor         = max_factor
+        self.previous_error     = 1e-4
+        self.rejected           = False
+
+    def propose(self, dt, error, *, accepted):
+        """ Return the next step size after a step of length `dt` with normalised `error` """
+        if not accepted:
+            self.rejected = True
+            if math.isinf(error):
+                return dt * self.min_factor
+            return dt * max(self.min_factor, self.safety * error**-self.alpha)
+
+        if error == 0:
+            factor = self.max_factor
+        else:
+            factor = self.safety * error**-self.alpha * self.previous_error**self.beta
+        # Do not grow the step right after a rejection
+        factor = min(1 if self.rejected else self.max_factor, max(self.min_factor, factor))
+
+        self.previous_error = max(error, 1e-4)
+        self.rejected = False
+        return dt * factor
+
+
+# Terminal events: the flight ends where any of these functions of the state crosses zero
+TERMINAL_LOG_MASS = -18
+TERMINAL_SPEED = 1000
+EVENT_ITERATIONS = 48
+
+# Below this altitude [m] the atmosphere is no longer negligible, see Meteor.coast
+COAST_ALTITUDE = 120000
+
+
+def event_burnout(state):
+    """ All mass has been ablated away, the particle is pronounced dead """
+    return state.log_mass - TERMINAL_LOG_MASS
+
+
+def event_meteorite(state):
+    """ The velocity is very low, it is a meteorite """
+    return state.speed() - TERMINAL_SPEED
+
+
+def geodetic_altitude(state):
+    return wgs84.ecef_to_wgs84(state.x, state.y, state.z).alt
+
+
+def event_impact(state):
+    """
+        The elevation is below zero. Points outside the sphere of the semi-major axis are always above
+        the ellipsoid, there only the (positive) bound r / a - 1 is returned to avoid the geodetic conversion.
+    """
+    radius_squared = (state.x * state.x + state.y * state.y + state.z * state.z) * coord.WGS84_INVAA
+    if radius_squared > 1:
+        return math.sqrt(radius_squared) - 1
+    return geodetic_altitude(state)
+
+
+TERMINAL_EVENTS = {
+    'burnout':      event_burnout,
+    'meteorite':    event_meteorite,
+    'impact':       event_impact,
+}
+
+
+def terminal_event(state):
+    """ Return the name of the first terminal event that has occurred at `state`, or None """
+    for name, event in TERMINAL_EVENTS.items():
+        if event(state) < 0:
+            return name
+    return None
 
 
 class Meteor:
@@ -124,20 +302,36 @@ class Meteor:
         self.position           = position
         self.velocity           = velocity
 
-        self.timestamp          = timestamp
+        # The flight clock is a float offset in seconds from a fixed epoch, see `timestamp`
+        self.epoch              = timestamp
         self.time               = 0.0
 
         self.shape_factor       = kwargs.get('shape_factor', 1.21)
         self.heat_transfer      = kwargs.get('heat_transfer', 0.5)
         self.ablation_heat      = kwargs.get('ablation_heat', 8e6)
+        # Importance sampling weight of the meteoroid, carried over to its sightings
+        self.weight             = kwargs.get('weight', 1.0)
 
         self.luminous_power     = 0
 
         self.id                 = self.timestamp.strftime("%Y%m%d-%H%M%S-%f")
-        self.frames             = []
+        self.frames             = models.trajectory.Trajectory(
+            epoch               = self.epoch,
+            mass_initial        = self.mass_initial,
+            density             = self.density,
+            ablation_heat       = self.ablation_heat,
+        )
+        self.frame_gate         = None
+        self.frames_dropped     = 0
+        self.altitude_refresh   = None
 
         log.debug(self.__str__())
 
+    @property
+    def timestamp(self):
+        """ Absolute time of the current state, only computed on request """
+        return self.epoch + datetime.timedelta(seconds=self.time)
+
     @staticmethod
     def load(filename):
         return Meteor.load_pickle(filename)
@@ -154,68 +348,136 @@ class Meteor:
     def save(self, filename):
         pickle.dump(self, io.FileIO(os.path.join(filename, f"{self.id}x{datetime.datetime.now().strftime('%H%M%S%f')}.pickle"), 'wb'))
 
-    def evaluate(self, state, diff, dt):
-        new_state = State(
-            state.position + diff.drdt * dt,
-            state.velocity + diff.dvdt * dt,
-            state.log_mass + diff.dmdt * dt,
-        )
-        if new_state.log_mass < -100:
+    def allocate_stages(self):
+        """ Create the integration state and the scratch stages reused by the steppers """
+        self.state = State.from_vectors(self.position, self.velocity, self.log_mass)
+        self.stage = State()
+        self.dense = State()
+        self.event = State()
+        self.stages = [Diff() for _ in range(11)]
+        # Day of year and solar activity are constant over a flight, bound once
+        self.air_density_at = atmosphere.MODEL.profile(day=atmosphere.day_of_year(self.epoch))
+        self.frames.air = atmosphere.MODEL.config
+        self.geodetic = coord.wgs84_latitude_altitude if self.altitude_refresh is None else coord.GeodeticTracker(self.altitude_refresh)
+
+    def release_stages(self):
+        """ Write the integration state back to the meteor and drop the scratch stages """
+        self.sync_state()
+        del self.state, self.stage, self.dense, self.event, self.stages, self.air_density_at, self.geodetic
+
+    def sync_state(self, state=None):
+        state = self.state if state is None else state
+        self.position = state.position
+        self.velocity = state.velocity
+        self.log_mass = state.log_mass
+
+    def evaluate(self, state, diff, dt, out):
+        """ Compute the derivative at `state + diff * dt`, storing it in the preallocated Diff `out` """
+        s = self.stage.set_advanced(state, diff, dt)
+        if s.log_mass < -100:
             raise OverflowError
 
-        coordinates = new_state.position.to_WGS84()
-        air_density = atmosphere.air_density(coordinates.alt)
-        speed = new_state.velocity.norm()
-        reynolds = atmosphere.Reynolds_number(self.radius, new_state.velocity.norm(), air_density / constants.AIR_VISCOSITY)
-        gamma = 1 #atmosphere.drag_coefficient_smooth_sphere(reynolds)
-
-        drag_vector = -(gamma * self.shape_factor * air_density * speed / (np.exp(new_state.log_mass / 3) * self.density**(2 / 3))) * new_state.velocity
-        gravity_vector = -constants.GRAVITATIONAL_CONSTANT * constants.EARTH_MASS / new_state.position.norm()**3 * new_state.position
-        coriolis_vector = -2 * EARTH_ROTATION ^ new_state.velocity
-        huygens_vector = -EARTH_ROTATION ^ (EARTH_ROTATION ^ new_state.position)
-        log_mass_change = -(self.heat_transfer * self.shape_factor * air_density * speed**3 * np.exp(-new_state.log_mass / 3) * self.density**(-2 / 3) / (2 * self.ablation_heat))
-
-        return Diff(
-            new_state.velocity,
-            drag_vector + gravity_vector + coriolis_vector + huygens_vector,
-            log_mass_change,
-        )
+        latitude, altitude = self.geodetic(s.x, s.y, s.z)
+        air_density = self.air_density_at(altitude, latitude)
+        speed = s.speed()
+        gamma = 1 #atmosphere.drag_coefficient_smooth_sphere(atmosphere.Reynolds_number(self.radius, speed, air_density / constants.AIR_VISCOSITY))
+
+        drag = gamma * self.shape_factor * air_density * speed / (math.exp(s.log_mass / 3) * self.density**(2 / 3))
+        gravity = constants.GRAVITATIONAL_CONSTANT * constants.EARTH_MASS / math.sqrt(s.x * s.x + s.y * s.y + s.z * s.z)**3
+        omega = constants.EARTH_ANGULAR_SPEED
+
+        out.dx, out.dy, out.dz = s.vx, s.vy, s.vz
+        # Drag, gravity, and Coriolis and centrifugal terms with Earth's rotation along the z axis
+        out.dvx = -drag * s.vx - gravity * s.x + 2 * omega * s.vy + omega * omega * s.x
+        out.dvy = -drag * s.vy - gravity * s.y - 2 * omega * s.vx + omega * omega * s.y
+        out.dvz = -drag * s.vz - gravity * s.z
+        out.dm = -(self.heat_transfer * self.shape_factor * air_density * speed**3 * math.exp(-s.log_mass / 3)
+                   * self.density**(-2 / 3) / (2 * self.ablation_heat))
+        return out
+
+    def evaluate_vacuum(self, state, diff, dt, out):
+        """ Same as evaluate, but without the atmosphere: only gravity and the fictitious forces act, mass is constant """
+        s = self.stage.set_advanced(state, diff, dt)
+        gravity = constants.GRAVITATIONAL_CONSTANT * constants.EARTH_MASS / math.sqrt(s.x * s.x + s.y * s.y + s.z * s.z)**3
+        omega = constants.EARTH_ANGULAR_SPEED
+
+        out.dx, out.dy, out.dz = s.vx, s.vy, s.vz
+        out.dvx = -gravity * s.x + 2 * omega * s.vy + omega * omega * s.x
+        out.dvy = -gravity * s.y - 2 * omega * s.vx + omega * omega * s.y
+        out.dvz = -gravity * s.z
+        out.dm = 0
+        return out
+
+    def step_vacuum(self, state, dt):
+        """ RK4 step of the vacuum two-body motion in the rotating frame, see evaluate_vacuum """
+        d1, d2, d3, d4, tmp, result = self.stages[:6]
+        self.evaluate_vacuum(state, DIFF_ZERO, dt, d1)
+        self.evaluate_vacuum(state, tmp.set_scaled(d1, 0.5), dt, d2)
+        self.evaluate_vacuum(state, tmp.set_scaled(d2, 0.5), dt, d3)
+        self.evaluate_vacuum(state, d3, dt, d4)
+        return result.set_combination((1 / 6, d1), (1 / 3, d2), (1 / 3, d3), (1 / 6, d4))
 
     def step_euler(self, state, dt):
-        return self.evaluate(state, Diff.zero(), dt)
+        return self.evaluate(state, DIFF_ZERO, dt, self.stages[0])
 
     def step_RK4(self, state, dt):
-        d1 = self.evaluate(state, Diff.zero(), dt)
-        d2 = self.evaluate(state, d1 * 0.5, dt)
-        d3 = self.evaluate(state, d2 * 0.5, dt)
-        d4 = self.evaluate(state, d3, dt)
-        return (d1 + 2 * d2 + 2 * d3 + d4) / 6
+        d1, d2, d3, d4, tmp, result = self.stages[:6]
+        self.evaluate(state, DIFF_ZERO, dt, d1)
+        self.evaluate(state, tmp.set_scaled(d1, 0.5), dt, d2)
+        self.evaluate(state, tmp.set_scaled(d2, 0.5), dt, d3)
+        self.evaluate(state, d3, dt, d4)
+        return result.set_combination((1 / 6, d1), (1 / 3, d2), (1 / 3, d3), (1 / 6, d4))
+
+    def step_DP_stages(self, state, dt, *, fsal=False):
+        """ Dormand-Prince stages, with `fsal` set the first stage already holds the derivative at `state` """
+        d1, d2, d3, d4, d5, d6, tmp, solution = self.stages[:8]
+        if not fsal:
+            self.evaluate(state, DIFF_ZERO, dt, d1)
+        self.evaluate(state, tmp.set_scaled(d1, DP_A21), dt, d2)
+        self.evaluate(state, tmp.set_combination((DP_A31, d1), (DP_A32, d2)), dt, d3)
+        self.evaluate(state, tmp.set_combination((DP_A41, d1), (DP_A42, d2), (DP_A43, d3)), dt, d4)
+        self.evaluate(state, tmp.set_combination((DP_A51, d1), (DP_A52, d2), (DP_A53, d3), (DP_A54, d4)), dt, d5)
+        self.evaluate(state, tmp.set_combination((DP_A61, d1), (DP_A62, d2), (DP_A63, d3), (DP_A64, d4), (DP_A65, d5)), dt, d6)
+        return solution.set_combination((DP_A71, d1), (DP_A73, d3), (DP_A74, d4), (DP_A75, d5), (DP_A76, d6))
 
     def step_DP_constant(self, state, dt):
-        d0 = Diff.zero()
-        d1 = self.evaluate(state, d0, dt)
-        d2 = self.evaluate(state, d1 * DP_A21, dt)
-        d3 = self.evaluate(state, d1 * DP_A31 + d2 * DP_A32, dt)
-        d4 = self.evaluate(state, d1 * DP_A41 + d2 * DP_A42 + d3 * DP_A43, dt)
-        d5 = self.evaluate(state, d1 * DP_A51 + d2 * DP_A52 + d3 * DP_A53 + d4 * DP_A54, dt)
-        d6 = self.evaluate(state, d1 * DP_A61 + d2 * DP_A62 + d3 * DP_A63 + d4 * DP_A64 + d5 * DP_A65, dt)
-        solution = d1 * DP_A71 + d3 * DP_A73 + d4 * DP_A74 + d5 * DP_A75 + d6 * DP_A76
-        return solution
-
-    def step_DP_adaptive(self, state, dt):
-        d0 = Diff.zero()
-        d1 = self.evaluate(state, d0, dt)
-        d2 = self.evaluate(state, d1 * DP_A21, dt)
-        d3 = self.evaluate(state, d1 * DP_A31 + d2 * DP_A32, dt)
-        d4 = self.evaluate(state, d1 * DP_A41 + d2 * DP_A42 + d3 * DP_A43, dt)
-        d5 = self.evaluate(state, d1 * DP_A51 + d2 * DP_A52 + d3 * DP_A53 + d4 * DP_A54, dt)
-        d6 = self.evaluate(state, d1 * DP_A61 + d2 * DP_A62 + d3 * DP_A63 + d4 * DP_A64 + d5 * DP_A65, dt)
-        solution = d1 * DP_A71 + d3 * DP_A73 + d4 * DP_A74 + d5 * DP_A75 + d6 * DP_A76
-        d7 = self.evaluate(state, solution, dt)
-        alternative = (d1 * DP_B1 + d3 * DP_B3 + d4 * DP_B4 + d5 * DP_B5 + d6 * DP_B6 + d7 * DP_B7)
-        error_estimate = solution - alternative
+        return self.step_DP_stages(state, dt)
+
+    def step_DP_adaptive(self, state, dt, *, fsal=False):
+        """
+            Embedded Dormand-Prince 5(4) step. The last stage is evaluated at the new state,
+            so after an accepted step it is swapped into the first slot and reused (first same as last).
+            Returns the fifth-order solution and the difference to the fourth-order one, both as derivatives.
+        """
+        solution = self.step_DP_stages(state, dt, fsal=fsal)
+        d1, _, d3, d4, d5, d6, _, _, d7, error_estimate = self.stages[:10]
+        self.evaluate(state, solution, dt, d7)
+        # Difference between the fifth- and fourth-order solutions
+        error_estimate.set_combination(
+            (DP_A71 - DP_B1, d1), (DP_A73 - DP_B3, d3), (DP_A74 - DP_B4, d4),
+            (DP_A75 - DP_B5, d5), (DP_A76 - DP_B6, d6), (-DP_B7, d7),
+        )
 
-        return max(error_estimate.dvdt.norm(), error_estimate.dmdt), solution
+        return solution, error_estimate
+
+    def error_norm(self, state, new_state, error_estimate, dt, rtol, atol):
+        """
+            Hairer's RMS error norm of an embedded step, with separate relative and absolute tolerances
+            for position [m], velocity [m/s] and log mass, so that no units are mixed
+        """
+        total = 0
+        for value, new_value, error, group in (
+            (state.x, new_state.x, error_estimate.dx, 0),
+            (state.y, new_state.y, error_estimate.dy, 0),
+            (state.z, new_state.z, error_estimate.dz, 0),
+            (state.vx, new_state.vx, error_estimate.dvx, 1),
+            (state.vy, new_state.vy, error_estimate.dvy, 1),
+            (state.vz, new_state.vz, error_estimate.dvz, 1),
+            (state.log_mass, new_state.log_mass, error_estimate.dm, 2),
+        ):
+            scale = atol[group] + rtol[group] * max(abs(value), abs(new_value))
+            total += (error * dt / scale)**2
+        return math.sqrt(total / 7)
 
     def select_integrator_constant(self, method='euler'):
         log.debug(f"Selected constant-step integrator {method}")
@@ -229,169 +491,566 @@ class Meteor:
         log.debug(f"Selected adaptive-step integrator {method}")
         return {
             'DP': self.step_DP_adaptive,
-        }.get(method, self.step_euler)
+        }.get(method, self.step_DP_adaptive)
+
+    def coast(self, fps, *, altitude=COAST_ALTITUDE, density=None, frames=True):
+        """
+            Fast-forward the meteoroid through the vacuum above the sensible atmosphere, one frame per step,
+            until the next frame would fall below `altitude` (or below the altitude where the air density
+            reaches `density` [kg/m³] in the active atmosphere model, if given). Drag and ablation are neglected there.
+                frames:     if set, dark frames are saved along the way with the full derivative,
+                            otherwise the coasting phase leaves no frames at all
+            The flight always ends on a frame instant, so any fly_* method can take over seamlessly.
+        """
+        if density is not None:
+            latitude, _ = coord.wgs84_latitude_altitude(self.position.x, self.position.y, self.position.z)
+            altitude = atmosphere.MODEL.altitude(density, latitude, atmosphere.day_of_year(self.epoch))
+
+        dt = 1.0 / fps
+        coasted = 0
+        self.allocate_stages()
+
+        try:
+            while geodetic_altitude(self.state) > altitude:
+                # A meteoroid that is not descending is left to the full integrator
+                if self.state.x * self.state.vx + self.state.y * self.state.vy + self.state.z * self.state.vz >= 0:
+                    break
+
+                diff = self.step_vacuum(self.state, dt)
+                if geodetic_altitude(self.stage.set_advanced(self.state, diff, dt)) < altitude:
+                    break
+
+                if frames:
+                    self.save_snapshot(self.evaluate(self.state, DIFF_ZERO, 0, self.stages[10]))
+
+                self.state.advance(diff, dt)
+                self.time += dt
+                coasted += 1
+        finally:
+            self.release_stages()
+            log.debug(f"Coasted for {coasted} frames")
+
+    def fly_constant(self, fps, spf, *, method='euler', jit=False):
+        # The kernel only knows the static MSIS profile
+        if jit and kernel.AVAILABLE and atmosphere.MODEL.compiled:
+            return self.fly_compiled(fps, spf, method=method)
 
-    def fly_constant(self, fps, spf, *, method='euler', wgs84=True):
         integrator = self.select_integrator_constant(method)
         dt = 1.0 / (fps * spf)
         clock = 0
         self.step = 0
+        self.allocate_stages()
 
         try:
             while True:
                 try:
-                    state = integrator(State(self.position, self.velocity, self.log_mass), dt)
+                    diff = integrator(self.state, dt)
                 except OverflowError:
                     break
 
                 if clock % spf == 0:
-                    self.save_snapshot(state, wgs84=wgs84)
+                    self.save_snapshot(diff)
                 clock += 1
 
-                self.position += state.drdt * dt
-                self.velocity += state.dvdt * dt
-                self.log_mass += state.dmdt * dt
+                # Within a constant step the state moves linearly along the combined derivative
+                theta = self.locate_event(lambda theta, out: out.set_advanced(self.state, diff, theta * dt))
+                self.state.advance(diff, theta * dt)
 
-                # Advance time by dt
-                self.timestamp += datetime.timedelta(seconds = dt)
-                self.time += dt
+                # Advance time by dt, or only up to the terminal event
+                self.time += theta * dt
                 self.step += 1
 
-                if self.check_terminate():
+                if theta < 1:
                     break
         except ValueError as e:
             log.debug(f"Generation aborted")
             raise e
         finally:
+            self.release_stages()
+            self.finish_frames()
             log.debug(f"Meteor generated ({len(self.frames)} frames)")
 
-    def fly_adaptive(self, fps, *, method='DP', wgs84=True, min_spf=1, max_spf=10000, error_coarser=1e-6, error_finer=1e-3):
-        integrator = self.select_integrator_adaptive()
-        spf = min_spf
-        if spf > max_spf:
-            spf = max_spf
-        clock = 0
+    def fly_compiled(self, fps, spf, *, method='euler'):
+        """ Same as fly_constant, but the whole trajectory is integrated by the compiled kernel in models.kernel """
+        times, states, diffs, final, duration, self.step = kernel.fly_constant(
+            self.kernel_state(), fps, spf, kernel.METHODS.get(method, 0), *self.kernel_parameters(),
+        )
+        self.save_compiled(times, states, diffs, final, duration)
+
+    def fly_adaptive_compiled(self, fps, *, rtol, atol, dt_min, dt_max):
+        """ Same as fly_adaptive with DP, but the whole trajectory is integrated by the compiled kernel in models.kernel """
+        times, states, diffs, final, duration, self.step, self.rejected = kernel.fly_adaptive(
+            self.kernel_state(), fps, np.array(rtol, dtype=float), np.array(atol, dtype=float), float(dt_min), float(dt_max),
+            *self.kernel_parameters(),
+        )
+        self.save_compiled(times, states, diffs, final, duration)
+        log.debug(f"{self.step} steps, {self.rejected} rejected")
+
+    def kernel_state(self):
+        return np.array([*self.position.as_numpy_vector(), *self.velocity.as_numpy_vector(), self.log_mass])
+
+    def kernel_parameters(self):
+        return (
+            float(self.shape_factor), float(self.density), float(self.heat_transfer), float(self.ablation_heat),
+            kernel.MSIS_LOG_DENSITY,
+        )
+
+    def save_compiled(self, times, states, diffs, final, duration):
+        """ Save the frames and the final state returned by the kernel, with times relative to the current one """
+        start = self.time
+        for time, state, diff in zip(times, states, diffs):
+            self.state = State(*state)
+            self.time = start + time
+            self.save_snapshot(Diff(*diff))
+
+        self.state = State(*final)
+        self.time = start + duration
+        self.sync_state()
+        del self.state
+        self.finish_frames()
+        log.debug(f"Meteor generated ({len(self.frames)} frames)")
+
+    def fly_adaptive(self, fps, *, method='DP', rtol=ADAPTIVE_RTOL, atol=ADAPTIVE_ATOL, dt_min=1e-9, dt_max=math.inf, jit=False):
+        """
+            Integrate with an adaptive step size controlled by the embedded error estimate.
+                rtol, atol:     relative and absolute tolerances, either a single number
+                                or a triple for (position, velocity, log mass)
+                dt_min, dt_max: bounds on the step size in seconds
+                jit:            use the compiled kernel if available, with the same restrictions as fly_constant
+            The step size is independent of the frame rate: frames are sampled at exact 1 / fps instants
+            from the continuous extension of every accepted step.
+        """
+        rtol = (rtol,) * 3 if isinstance(rtol, numbers.Number) else tuple(rtol)
+        atol = (atol,) * 3 if isinstance(atol, numbers.Number) else tuple(atol)
+        if jit and kernel.AVAILABLE and atmosphere.MODEL.compiled:
+            return self.fly_adaptive_compiled(fps, rtol=rtol, atol=atol, dt_min=dt_min, dt_max=dt_max)
+
+        integrator = self.select_integrator_adaptive(method)
+        controller = StepController()
+
+        frame = 1.0 / fps
+        start = self.time
+        time = start
+        dt = min(frame, dt_max)
         self.step = 0
-        last_change = 0
+        self.rejected = 0
+        self.allocate_stages()
 
         try:
+            self.evaluate(self.state, DIFF_ZERO, 0, self.stages[0])
+            self.save_snapshot(self.stages[0])
+            frames = 1
+
             while True:
-                dt = 1.0 / (fps * spf)
-                self.step += 1
-                error, diff = integrator(State(self.position, self.velocity, self.log_mass), dt)
-
-                if error < error_coarser and spf > min_spf:
-                    log.debug(f"Step unnecessarily small (error = {error:.6f}), {clock}/{spf}")
-                    if clock % 2 == 0:
-                        spf //= 2
-                        clock //= 2
-                        log.debug(f"Decreasing to {spf} steps per frame at clock {clock}")
-                        last_change = +1
-                        continue
-                    else:
-                        log.debug("Waiting another step")
-                        pass
-
-                if error > error_finer and spf < max_spf and last_change != 1:
-                    spf *= 2
-                    clock *= 2
-                    log.debug(f"Step too long (error = {error:.6f}), increasing to {spf} steps per frame at clock {clock}")
-                    last_change = -1
+                h = dt
+                try:
+                    diff, error_estimate = integrator(self.state, h, fsal=True)
+                except OverflowError:
+                    # The trial step went too far into ablation, the first stage is still valid
+                    error = math.inf
+                else:
+                    error = self.error_norm(self.state, self.stage, error_estimate, h, rtol, atol)
+
+                if error > 1:
+                    self.rejected += 1
+                    dt = controller.propose(h, error, accepted=False)
+                    log.debug(f"Step rejected (error = {error:.6f}), decreasing to {dt:.6e} s")
+                    if dt < dt_min:
+                        log.debug("Step size underflow")
+                        break
                     continue
 
-                last_change = 0
-
-                if clock % spf == 0:
-                    self.save_snapshot(diff, wgs84=wgs84)
-                    clock = 0
+                theta = self.locate_event(lambda theta, out: self.dense_output(self.state, h, theta, out))
+                if theta < 1:
+                    # The flight ends within this step: record the remaining frames and stop at the event
+                    while start + frames * frame <= time + theta * h:
+                        self.save_frame_within(time, h, start + frames * frame)
+                        frames += 1
+                    self.dense_output(self.state, h, theta, self.state)
+                    time += theta * h
+                    self.step += 1
+                    break
 
-                self.position += diff.drdt * dt
-                self.velocity += diff.dvdt * dt
-                self.log_mass += diff.dmdt * dt
+                # Record all frames that fall within the accepted step
+                while start + frames * frame <= time + h:
+                    self.save_frame_within(time, h, start + frames * frame)
+                    frames += 1
 
-                # Advance time by dt
-                self.timestamp += datetime.timedelta(seconds = dt)
-                self.time += dt
-                clock += 1
+                self.state.advance(diff, h)
+                # First same as last: the derivative at the new state becomes the first stage of the next step
+                self.stages[0], self.stages[8] = self.stages[8], self.stages[0]
 
-                if self.check_terminate():
-                    break
+                time += h
+                self.step += 1
+                dt = min(controller.propose(h, error, accepted=True), dt_max)
         except ValueError:
             log.info("Generation aborted")
         finally:
-            log.debug(f"Meteor generated ({len(self.frames)} frames)")
+            self.time = time
+            self.release_stages()
+            self.finish_frames()
+            log.debug(f"Meteor generated ({len(self.frames)} frames, {self.step} steps, {self.rejected} rejected)")
+
+    def dense_output(self, state, dt, theta, out):
+        """
+            Evaluate the fourth-order continuous extension of the last Dormand-Prince step (Hairer's dopri5)
+            at `state + theta * dt`, 0 <= theta <= 1, into the State `out`
+        """
+        d1, _, d3, d4, d5, d6, tmp, solution, d7, _ = self.stages[:10]
+        rest = 1 - theta
+        shape = theta * theta * rest * rest
+        tmp.set_combination(
+            (theta * (1 - rest + 2 * theta * rest), solution),
+            (theta * rest * rest + shape * DP_D1, d1),
+            (shape * DP_D3, d3),
+            (shape * DP_D4, d4),
+            (shape * DP_D5, d5),
+            (shape * DP_D6, d6),
+            (-theta * theta * rest + shape * DP_D7, d7),
+        )
+        return out.set_advanced(state, tmp, dt)
+
+    def save_frame_within(self, time, dt, instant):
+        """ Save the frame at `instant` from within the step of length `dt` that began at `time` """
+        self.time = instant
+        self.save_dense_snapshot(dt, (instant - time) / dt)
+
+    def save_dense_snapshot(self, dt, theta):
+        """ Save a snapshot of the interpolated state within the last step, with its derivative evaluated exactly """
+        dense = self.dense_output(self.state, dt, theta, self.dense)
+        try:
+            self.evaluate(dense, DIFF_ZERO, 0, self.stages[10])
+        except OverflowError:
+            return
+        self.save_snapshot(self.stages[10], state=dense)
 
     def check_terminate(self):
         """Check if the simulation of the flight should be terminated"""
-        # If all mass has been ablated away, the particle is pronounced dead
-        if self.log_mass < -18:
+        return self.log_terminal_event(terminal_event(self.state), self.state)
+
+    def log_terminal_event(self, name, state):
+        if name == 'burnout':
             log.debug("Burnt to death")
-            return True
+        elif name == 'meteorite':
+            log.debug(f"Survived with final mass {math.exp(state.log_mass):12.6f} kg")
+        elif name == 'impact':
+            log.debug("IMPACT")
+        return name is not None
+
+    def locate_event(self, interpolate):
+        """
+            Find the fraction of the last step at which the flight terminates, or 1 if it does not.
+            `interpolate(theta, out)` must write the state at fraction `theta` of the step into `out`.
+            The cheap event functions are tested at the end of the step first, the crossing is then bisected,
+            so that the returned fraction always lies just past the event.
+        """
+        name = terminal_event(interpolate(1, self.event))
+        if name is None:
+            return 1
+
+        low, high = 0, 1
+        for _ in range(EVENT_ITERATIONS):
+            middle = (low + high) / 2
+            found = terminal_event(interpolate(middle, self.event))
+            if found is None:
+                low = middle
+            else:
+                high, name = middle, found
+
+        self.log_terminal_event(name, interpolate(high, self.event))
+        return high
+
+    def save_snapshot(self, diff, *, state=None):
+        """
+            Record the raw state and the mass loss rate as a new frame. All derived quantities are computed
+            afterwards from the whole trajectory, see models.trajectory.Trajectory (which always uses WGS84).
+        """
+        self.sync_state(state)
+        self.mass = math.exp(self.log_mass)
+        self.mass_change = self.mass * diff.dmdt
+        self.record_frame()
+
+    def gate_frames(self, *, magnitude=None, power=None, margin=2):
+        """
+            Record only frames brighter than `magnitude` (absolute) or more luminous than `power` [W]
+            during the following flight, with `margin` frames around them and the first and the last frame,
+            see models.frame.FrameGate. Calls to coast and the next fly_* share the gate.
+        """
+        self.frame_gate = models.frame.FrameGate(magnitude=magnitude, power=power, margin=margin)
+
+    def track_altitude(self, *, refresh=64):
+        """
+            Compute the altitude for the air density incrementally during the following flights,
+            with the exact conversion every `refresh` evaluations only, see coord.GeodeticTracker.
+            Events are still located with the exact altitude.
+        """
+        self.altitude_refresh = refresh
+
+    def record_frame(self):
+        """ Append the current state as a new frame of the trajectory """
+        self.frames.append(self)
+        if self.frame_gate is not None:
+            self.frame_gate.push(self.frames)
+
+    def record_frames(self, rows):
+        """ Append frames recorded elsewhere (see MeteorBatch) as an array of trajectory rows """
+        if self.frame_gate is None:
+            self.frames.extend(rows)
+        else:
+            # The gate decides about every frame as it arrives, as in record_frame
+            for row in rows:
+                self.frames.extend(row[np.newaxis])
+                self.frame_gate.push(self.frames)
+
+    def finish_frames(self):
+        """ Close the frame gate at the end of a flight, if there is one """
+        if self.frame_gate is not None:
+            self.frame_gate.close(self.frames)
+            self.frames_dropped += self.frame_gate.dropped
+            self.frame_gate = None
 
-        # If the particle flew above 400 km, it will likely leave Earth altogether
-        #if self.position.elevation() > 400000:
-        #    log.debug("Flew away")
-        #    break
+    def print_info(self, spf):
+        """ Print the last recorded frame """
+        frame = self.frames[-1]
+        log.debug(
+            f"{self.step:4d} | "
+            f"{frame.time:8.3f} s | "
+            f"{frame.position:w10.6f,10.3f} | "
+            f"{frame.velocity_altaz:s10.6f,9.3f} m/s | "
+            f"\u03c1 {frame.air_density:9.3e} kg/m³ | "
+            #f"{radiometry.luminous_efficiency(frame.speed):6.4f} "
+            #f"{self.frames.reynolds_number[-1]:8.0f} | "
+            #f"Q {self.frames.dynamic_pressure[-1]:8.0f} Pa | "
+            f"{self.mass_initial:6.2e} kg, {frame.mass:6.2e} kg, {frame.mass_change:9.3e} kg/s, "
+            f"{self.frames.radius[-1] * 1000:7.3f} mm | "
+            #f"{frame.luminous_power:10.3e} W, "
+            f"{frame.absolute_magnitude:6.2f}m"
+        )
 
-        # If the velocity is very low, it is a meteorite
-        if self.velocity.norm() < 1000:
-            log.debug(f"Survived with final mass {self.mass:12.6f} kg")
-            return True
 
-        # If the elevation is below zero, we have an impact
-        if self.position.to_WGS84().alt < 0:
-            log.debug("IMPACT")
-            return True
+    def reduce_to_point(self):
+        """ Keep only the most luminous frame """
+        if len(self.frames) > 0:
+            self.frames = self.frames.take([int(np.argmax(self.frames.luminous_power))])
+
+    def simulate(self):
+        self.fly()
+        self.save()
 
 
-    def save_snapshot(self, state, *, wgs84):
-        coordinates = self.position.to_WGS84() if wgs84 else self.position.to_spherical()
+class MeteorBatch:
+    """
+        A batch of meteoroids flown in lockstep, with the state held as a structure of arrays.
+        Every row of `state` is one meteoroid: position (x, y, z), velocity (vx, vy, vz) and log mass.
+        Rows are dropped from the active set as soon as their flight terminates, and their final state
+        is written back to the original Meteor objects. Frames are collected in one array shared by all rows
+        and only handed out to the Meteors once the whole batch has landed.
+    """
+    def __init__(self, meteors):
+        self.meteors            = list(meteors)
+        # Meteors may have already coasted for a while before the batch is formed
+        self.offsets            = np.array([meteor.time for meteor in self.meteors], dtype=float)
+
+        self.state              = np.column_stack((
+            coord.Vector3DArray.from_vectors(meteor.position for meteor in self.meteors).data,
+            coord.Vector3DArray.from_vectors(meteor.velocity for meteor in self.meteors).data,
+            np.array([meteor.log_mass for meteor in self.meteors], dtype=float),
+        ))
+
+        self.index              = np.arange(len(self.meteors))
+        self.density            = np.array([meteor.density for meteor in self.meteors], dtype=float)
+        self.shape_factor       = np.array([meteor.shape_factor for meteor in self.meteors], dtype=float)
+        self.heat_transfer      = np.array([meteor.heat_transfer for meteor in self.meteors], dtype=float)
+        self.ablation_heat      = np.array([meteor.ablation_heat for meteor in self.meteors], dtype=float)
+        self.mass_initial       = np.array([meteor.mass_initial for meteor in self.meteors], dtype=float)
+        self.day                = np.array([atmosphere.day_of_year(meteor.epoch) for meteor in self.meteors], dtype=float)
+        for meteor in self.meteors:
+            meteor.frames.air = atmosphere.MODEL.config
 
-        speed = self.velocity.norm()
-        self.air_density = atmosphere.air_density(coordinates.alt)
-        self.velocity_altaz = self.velocity.dxdydz_to_altaz_at(self.position)
-        self.mass = np.exp(self.log_mass)
-        self.radius = ((3 * self.mass) / (4 * np.pi * self.density))**(1 / 3)
+        self.time               = 0.0
+        self.steps              = np.zeros(len(self.meteors), dtype=int)
 
-        self.reynolds_number = atmosphere.Reynolds_number(2 * self.radius, speed, self.air_density)
-        self.gamma = atmosphere.drag_coefficient_smooth_sphere(self.reynolds_number)
-        self.dynamic_pressure = self.air_density * speed**2
-        self.acceleration = state.dvdt.norm()
-        self.mass_change = self.mass * state.dmdt
+        # Recorded frames of all active rows: index of the meteor followed by the trajectory columns
+        self.frames             = np.empty((64, 1 + len(models.trajectory.Trajectory.COLUMNS)))
+        self.frame_count        = 0
 
-        self.luminous_power = -(radiometry.luminous_efficiency(speed) * self.mass_change * speed**2 / 2.0)
-        self.absolute_magnitude = radiometry.absolute_magnitude(self.luminous_power)
+    def __len__(self):
+        return len(self.index)
 
-        self.frames.append(models.frame.Frame(self))
+    def evaluate(self, state, diff, dt):
+        new_state = state + diff * dt
+        position, velocity, log_mass = new_state[:, 0:3], new_state[:, 3:6], new_state[:, 6]
+        # Equivalent of the OverflowError raised by Meteor.evaluate, collected per row
+        self.overflow |= log_mass < -100
+
+        latitude, _, altitude = coord.ecef_to_wgs84_array(position[:, 0], position[:, 1], position[:, 2])
+        air_density = atmosphere.MODEL.density(altitude, latitude, self.day)
+        speed = np.linalg.norm(velocity, axis=1)
+        gamma = 1
+
+        drag = gamma * self.shape_factor * air_density * speed / (np.exp(log_mass / 3) * self.density**(2 / 3))
+        gravity = constants.GRAVITATIONAL_CONSTANT * constants.EARTH_MASS / np.linalg.norm(position, axis=1)**3
+        omega = constants.EARTH_ANGULAR_SPEED
+
+        result = np.empty_like(new_state)
+        result[:, 0:3] = velocity
+        result[:, 3:6] = -drag[:, np.newaxis] * velocity - gravity[:, np.newaxis] * position
+        # Coriolis and centrifugal terms with Earth's rotation along the z axis, written out component-wise
+        result[:, 3] += 2 * omega * velocity[:, 1] + omega**2 * position[:, 0]
+        result[:, 4] += -2 * omega * velocity[:, 0] + omega**2 * position[:, 1]
+        result[:, 6] = -(self.heat_transfer * self.shape_factor * air_density * speed**3 * np.exp(-log_mass / 3)
+                         * self.density**(-2 / 3) / (2 * self.ablation_heat))
+        return result
 
-    def print_info(self, spf):
-        log.debug(
-            f"{self.step:4d} | "
-            f"{self.time:8.3f} s | "
-            f"{self.position:w10.6f,10.3f} | "
-            f"{self.velocity_altaz:s10.6f,9.3f} m/s | "
-            f"\u03c1 {self.air_density:9.3e} kg/m³ | "
-            f"{self.acceleration:13.3f} m/s², "
-            #f"{radiometry.luminous_efficiency(self.velocity.norm()):6.4f} "
-            #f"{self.reynolds_number:8.0f} | "
-            #f"\u0393 {self.gamma:8.2f} | "
-            #f"Q {self.dynamic_pressure:8.0f} Pa | "
-            f"{self.mass_initial:6.2e} kg, {self.mass:6.2e} kg, {self.mass_change:9.3e} kg/s, "
-            f"{self.radius * 1000:7.3f} mm | "
-            #f"{self.luminous_power:10.3e} W, "
-            f"{self.absolute_magnitude:6.2f}m"
-        )
+    def step_euler(self, state, dt):
+        return self.evaluate(state, 0, dt)
 
+    def step_RK4(self, state, dt):
+        d1 = self.evaluate(state, 0, dt)
+        d2 = self.evaluate(state, d1 * 0.5, dt)
+        d3 = self.evaluate(state, d2 * 0.5, dt)
+        d4 = self.evaluate(state, d3, dt)
+        return (d1 + 2 * d2 + 2 * d3 + d4) / 6
 
-    def reduce_to_point(self):
-        max_light = np.inf
+    def step_DP_constant(self, state, dt):
+        d1 = self.evaluate(state, 0, dt)
+        d2 = self.evaluate(state, d1 * DP_A21, dt)
+        d3 = self.evaluate(state, d1 * DP_A31 + d2 * DP_A32, dt)
+        d4 = self.evaluate(state, d1 * DP_A41 + d2 * DP_A42 + d3 * DP_A43, dt)
+        d5 = self.evaluate(state, d1 * DP_A51 + d2 * DP_A52 + d3 * DP_A53 + d4 * DP_A54, dt)
+        d6 = self.evaluate(state, d1 * DP_A61 + d2 * DP_A62 + d3 * DP_A63 + d4 * DP_A64 + d5 * DP_A65, dt)
+        return d1 * DP_A71 + d3 * DP_A73 + d4 * DP_A74 + d5 * DP_A75 + d6 * DP_A76
 
-        for frame in self.frames:
-            if frame.absolute_magnitude < max_light:
-                max_light = frame.absolute_magnitude
+    def select_integrator_constant(self, method='euler'):
+        log.debug(f"Selected constant-step batch integrator {method}")
+        return {
+            'euler': self.step_euler,
+            'RK4': self.step_RK4,
+            'DP': self.step_DP_constant,
+        }.get(method, self.step_euler)
 
-        self.frames = [frame]
+    def fly_constant(self, fps, spf, *, method='euler'):
+        integrator = self.select_integrator_constant(method)
+        dt = 1.0 / (fps * spf)
+        clock = 0
 
-    def simulate(self):
-        self.fly()
-        self.save()
+        # Nearly ablated rows may overflow before they are caught by check_terminate, this is handled explicitly
+        try:
+            with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+                while len(self) > 0:
+                    self.overflow = np.zeros(len(self), dtype=bool)
+                    diff = integrator(self.state, dt)
+
+                    # Rows that overflowed are dropped without a snapshot, as in Meteor.fly_constant
+                    overflow = self.overflow | ~np.isfinite(diff).all(axis=1)
+                    if overflow.any():
+                        self.retire(overflow)
+                        diff = diff[~overflow]
+
+                    if clock % spf == 0:
+                        self.save_snapshot(diff)
+                    clock += 1
+
+                    # Rows that terminate within this step are only advanced up to the event
+                    theta = self.locate_events(diff, dt)
+                    self.state += diff * (theta * dt)[:, np.newaxis]
+                    elapsed = self.time + theta * dt
+                    self.time += dt
+                    self.steps += 1
+
+                    self.retire(theta < 1, elapsed=elapsed)
+        finally:
+            self.write_frames()
+
+        log.debug(f"Batch of {len(self.meteors)} meteors generated")
+        return self.meteors
+
+    def check_terminate(self, state=None):
+        """ Return a mask of rows whose flight should be terminated, see meteor.terminal_event """
+        state = self.state if state is None else state
+        mask = (state[:, 6] < TERMINAL_LOG_MASS) | (np.linalg.norm(state[:, 3:6], axis=1) < TERMINAL_SPEED)
+
+        # Only rows inside the sphere of the semi-major axis can be below the ellipsoid
+        low = ~mask & (np.einsum('ij,ij->i', state[:, 0:3], state[:, 0:3]) * coord.WGS84_INVAA <= 1)
+        if low.any():
+            _, _, altitude = coord.ecef_to_wgs84_array(state[low, 0], state[low, 1], state[low, 2])
+            mask[low] = altitude < 0
+        return mask
+
+    def locate_events(self, diff, dt):
+        """ Return the fraction of the step at which every row terminates (1 where it does not), see Meteor.locate_event """
+        theta = np.ones(len(self))
+        rows = self.check_terminate(self.state + diff * dt)
+        if not rows.any():
+            return theta
+
+        state, diff = self.state[rows], diff[rows]
+        low, high = np.zeros(len(state)), np.ones(len(state))
+        for _ in range(EVENT_ITERATIONS):
+            middle = (low + high) / 2
+            found = self.check_terminate(state + diff * (middle * dt)[:, np.newaxis])
+            high = np.where(found, middle, high)
+            low = np.where(found, low, middle)
+
+        theta[rows] = high
+        return theta
+
+    def retire(self, mask, *, elapsed=None):
+        """ Write back the final state of masked rows to their Meteors and remove them from the active set """
+        if not mask.any():
+            return
+
+        for row in np.flatnonzero(mask):
+            self.write_back(row, elapsed=None if elapsed is None else elapsed[row])
+
+        keep = ~mask
+        self.state              = self.state[keep]
+        self.index              = self.index[keep]
+        self.steps              = self.steps[keep]
+        self.density            = self.density[keep]
+        self.shape_factor       = self.shape_factor[keep]
+        self.heat_transfer      = self.heat_transfer[keep]
+        self.ablation_heat      = self.ablation_heat[keep]
+        self.mass_initial       = self.mass_initial[keep]
+        self.day                = self.day[keep]
+
+    def write_frames(self):
+        """ Hand every Meteor its own frames, grouped by a single stable sort of the whole batch """
+        frames = self.frames[:self.frame_count]
+        frames = frames[np.argsort(frames[:, 0], kind='stable')]
+        bounds = np.searchsorted(frames[:, 0], np.arange(len(self.meteors) + 1))
+
+        for number, meteor in enumerate(self.meteors):
+            meteor.record_frames(frames[bounds[number]:bounds[number + 1], 1:])
+            meteor.finish_frames()
+
+    def write_back(self, row, *, elapsed=None):
+        """ Write the final state of a row back to its Meteor """
+        meteor = self.meteors[self.index[row]]
+        meteor.position         = coord.Vector3D(*self.state[row, 0:3])
+        meteor.velocity         = coord.Vector3D(*self.state[row, 3:6])
+        meteor.log_mass         = self.state[row, 6]
+        meteor.mass             = math.exp(meteor.log_mass)
+        elapsed                 = self.time if elapsed is None else elapsed
+        meteor.time             = self.offsets[self.index[row]] + elapsed
+        meteor.step             = self.steps[row]
+        return meteor
+
+    def save_snapshot(self, diff):
+        """ Record the raw state of every active row as a block of frames, see Meteor.save_snapshot """
+        count = len(self)
+        if self.frame_count + count > len(self.frames):
+            frames = np.empty((max(2 * len(self.frames), self.frame_count + count), self.frames.shape[1]))
+            frames[:self.frame_count] = self.frames[:self.frame_count]
+            self.frames = frames
+
+        trajectory = models.trajectory.Trajectory
+        mass = np.exp(self.state[:, 6])
+        block = self.frames[self.frame_count:self.frame_count + count]
+        block[:, 0]                                 = self.index
+        frames = block[:, 1:]
+        frames[:, trajectory.TIME]                  = self.offsets[self.index] + self.time
+        frames[:, trajectory.X:trajectory.VZ + 1]   = self.state[:, 0:6]
+        frames[:, trajectory.MASS]                  = mass
+        frames[:, trajectory.MASS_CHANGE]           = mass * diff[:, 6]
+        self.frame_count += count
@@ -62,63 +62,6 @@ class Observation():
             'observer':     self.observer.id,
         }
 
-    """
-    def make_KDEs(self):
-        log.info(f"Creating KDEs for observer {c.name(self.id)}, {c.num(len(self.visible.index))} sightings to process")
-        self.dataset.create('analyses', 'kdes', self.id, exist_ok = True)
-
-        for stat, params in self.settings.kdes.quantities.items():
-            self.make_KDE(stat, **params)
-
-    def compute_KDE(self, stat):
-        return scipy.stats.gaussian_kde(self.visible[stat])
-
-    def render_KDE(self, stat, *, min, max, bin, **kwargs):
-        log.info(f"Creating a KDE for {c.param(stat)}")
-        points = 20 * (max - min) // bin
-        space = np.linspace(min, max, points)
-        pdf = self.compute_KDE(stat).evaluate(space)
-
-        figure, axes = self.empty_figure()
-        axes.fill_between(space, 0, pdf, alpha = 0.5)
-        figure.savefig(self.dataset.path('analyses', 'kdes', self.id, f"{stat}.png"))
-        pyplot.close(figure)
-
-    def make_histograms(self):
-        log.info(f"Creating histograms for observer {c.name(self.id)}, {c.num(len(self.visible.index))} sightings to process")
-        self.dataset.create('analyses', 'histograms', self.id, exist_ok = True)
-
-        for stat, params in self.settings.histograms.quantities.items():
-            self.make_histogram(stat, params)
-
-    def make_histogram(self, stat, params):
-        log.info(f"Creating a histogram for {c.param(stat)}")
-        hist, edges = self.computeHistogram(stat, params)
-
-        figure, axes = self.emptyFigure()
-        axes.bar(edges[:-1], hist, width = params.bin, alpha = 0.5, align = 'edge', color = (0.1, 0.7, 0.4, 0.5), edgecolor = (0.1, 0.3, 0.2, 1))
-        axes.set_xlabel(params.name)
-        axes.set_ylabel('relative count')
-        figure.savefig(self.dataset.path('analyses', 'histograms', self.id, f"{stat}.png"))
-        pyplot.close(figure)
-
-        np.savetxt(
-            self.dataset.path('analyses', 'histograms', self.id, f"{stat}.tsv"),
-            np.vstack((edges[:-1], hist)).T,
-            delimiter       = '\t',
-            fmt             = ('%.10f', '%.10f'),
-        )
-
-    def computeHistogram(self, stat, params):
-        count = int(np.ceil((params.max - params.min) / params.bin))
-        bins = np.linspace(params.min, params.max, count + 1)
-        hist, edges = np.histogram(self.visible[stat], bins = bins, range = (params.min, params.max), density = True)
-        return hist, edges
-
-    def __str__(self):
-        return f"Observation by observer {c.name(self.observer)}"
-    """
-
 
 def init_observe(_queue, _observer, _streaks):
     global queue, observer, streaks
@@ -1,3 +1,4 @@
+import collections
 import logging
 import os
 import numpy as np
@@ -9,6 +10,69 @@ from utilities                  import colour as c
 log = logging.getLogger('root')
 
 
+View = collections.namedtuple('View', ['local', 'altitude', 'azimuth', 'distance', 'range_rate', 'angular_speed'])
+
+
+class ObserverGeometry:
+    """
+        Immutable precomputed geometry of a stationary observer: ECEF position (as a Vector3D and as an array),
+        WGS84 coordinates, the matrix rotating ECEF offsets to the local alt-az frame and the horizon.
+        `observe` evaluates any number of points at once, with a single matrix product.
+    """
+    __slots__ = ('position', 'origin', 'latitude', 'longitude', 'elevation', 'matrix', 'horizon')
+
+    def __init__(self, position, horizon=0):
+        coordinates = position.to_WGS84()
+        origin = position.as_numpy_vector()
+        origin.flags.writeable = False
+
+        for name, value in [
+            ('position',        coord.Vector3D(position.x, position.y, position.z)),
+            ('origin',          origin),
+            ('latitude',        coordinates.lat),
+            ('longitude',       coordinates.lon),
+            ('elevation',       coordinates.alt),
+            ('matrix',          position.rotation_matrix()),
+            ('horizon',         horizon),
+        ]:
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ObserverGeometry is immutable, cannot set '{name}'")
+
+    def __reduce__(self):
+        return (self.__class__, (self.position, self.horizon))
+
+    def local(self, points):
+        """ Transform N × 3 ECEF points to N × 3 vectors in the local alt-az frame """
+        return (np.asarray(points, dtype=float).reshape(-1, 3) - self.origin) @ self.matrix.T
+
+    def observe(self, points, velocities=None):
+        """
+            Observe N × 3 ECEF points, optionally moving with N × 3 ECEF velocities. Returns a View of arrays:
+                local:          N × 3 vectors in the local alt-az frame
+                altitude:       altitude above the horizontal plane [°]
+                azimuth:        azimuth [°], as given by Vector3D.to_spherical
+                distance:       range [m]
+                range_rate:     rate of change of the range [m/s], None without velocities
+                angular_speed:  apparent angular speed [°/s], None without velocities
+        """
+        local = self.local(points)
+        distance = np.sqrt(np.einsum('ij,ij->i', local, local))
+        altitude = np.degrees(np.arcsin(local[:, 2] / distance))
+        azimuth = np.degrees(np.arctan2(local[:, 1], local[:, 0]))
+        if velocities is None:
+            return View(local, altitude, azimuth, distance, None, None)
+
+        # Both are invariant under the rotation, so the ECEF offsets are used directly
+        relative = np.asarray(points, dtype=float).reshape(-1, 3) - self.origin
+        velocities = np.asarray(velocities, dtype=float).reshape(-1, 3)
+        dot = np.einsum('ij,ij->i', relative, velocities)
+        rejection = velocities - (dot / distance**2)[:, np.newaxis] * relative
+        angular_speed = np.degrees(np.linalg.norm(rejection, axis=1) / distance)
+        return View(local, altitude, azimuth, distance, dot / distance, angular_speed)
+
+
 class Observer():
     def __init__(self, id, parameters):
         self.id                 = id
@@ -19,7 +83,9 @@ class Observer():
         except KeyError:
             self.horizon        = 0
 
-        self.rotation_matrix = self.position.rotation_matrix()
+        self.geometry           = ObserverGeometry(self.position, self.horizon)
+        self.elevation          = self.geometry.elevation
+        self.rotation_matrix    = self.geometry.matrix
 
     def alt_az(self, point: coord.Vector3D) -> coord.Vector3D:
         """
@@ -31,12 +97,11 @@ class Observer():
         return f"{c.name(self.name)} ({c.name(self.id)}) at {self.position.str_WGS84()}"
 
     def as_dict(self):
-        pos = self.position.to_WGS84()
         return {
             'name':         self.name,
-            'latitude':     pos.lat,
-            'longitude':    pos.lon,
-            'altitude':     pos.alt, 
+            'latitude':     self.geometry.latitude,
+            'longitude':    self.geometry.longitude,
+            'altitude':     self.geometry.elevation,
             'horizon':      self.horizon,
         }
 
@@ -1,10 +1,14 @@
 import datetime
+import dotmap
 import logging
 import yaml
 
 from core.parallel      import parallel
 from core               import exceptions, configuration
 from models             import Meteor, Generator
+from models.meteor      import MeteorBatch
+from models             import kernel
+from physics            import atmosphere
 from utilities          import colour as c
 
 log = logging.getLogger('root')
@@ -57,35 +61,129 @@ class Population():
         self.count = self.generator.count
         self.iterations = self.generator.iterations
 
-    def simulate(self, fps, spf, *, processes=1, period=1):
+    def simulate(self, fps, spf, *, processes=1, period=1, **options):
+        settings = self.configure_simulation(fps, spf, processes=processes, **options)
+
+        self.meteors        = self.simulate_meteors(self.meteors, settings, processes=processes, period=period)
+        self.total_frames   = sum(map(lambda x: len(x.frames), self.meteors))
+        self.total_mass     = sum(map(lambda x: x.mass_initial * x.weight, self.meteors))
+        self.total_dropped  = sum(map(lambda x: x.frames_dropped, self.meteors))
+        self.log_simulated(settings)
+
+    def stream(self, dataset, fps, spf, *, chunk, processes=1, period=1, **options):
+        """
+            Generate, simulate and save the population in chunks of `chunk` meteoroids:
+            every chunk is flushed to the dataset before the next one is drawn,
+            so that only one chunk is ever kept in memory.
+        """
+        settings = self.configure_simulation(fps, spf, processes=processes, **options)
+        log.info(f"Streaming the population in chunks of {c.num(chunk)} meteoroids")
+
+        self.meteors        = []
+        self.total_frames   = 0
+        self.total_mass     = 0
+        self.total_dropped  = 0
+
+        for index, meteors in enumerate(self.generator.chunks(chunk)):
+            log.info(f"Chunk {c.num(index)}: simulating {c.num(len(meteors))} meteoroids")
+            meteors = self.simulate_meteors(meteors, settings, processes=processes, period=period)
+
+            self.total_frames   += sum(map(lambda x: len(x.frames), meteors))
+            self.total_mass     += sum(map(lambda x: x.mass_initial * x.weight, meteors))
+            self.total_dropped  += sum(map(lambda x: x.frames_dropped, meteors))
+            self.save_meteors(dataset, meteors)
+
+        self.count = self.generator.count
+        self.iterations = self.generator.iterations
+        self.log_simulated(settings)
+        self.save_metadata(dataset)
+
+    def configure_simulation(self, fps, spf, *, processes=1, batch=None, jit=False, adaptive=None, coast=None, gate=None, air=None, altitude=None):
+        """ Check and log the simulation options, return them as settings for `simulate_meteors` """
         log.info(f"Simulating atmospheric entry: using {c.num(processes)} processes at {c.num(fps)} frames per second, "
                  f"""with {c.num(spf)} steps per frame, saving as {c.over(f"{'streaks' if self.streaks else 'points'}")}""")
-        self.meteors = parallel(
-            simulate,
-            self.meteors,
-            initializer     = init_simulate,
-            initargs        = (fps, spf, self.streaks),
-            processes       = min(self.count, processes),
-            period          = period,
-            action          = "Simulating meteors",
+        if jit and not kernel.AVAILABLE:
+            log.warning(f"Compiled flight kernel requested, but {c.name('numba')} is not available, falling back to pure Python")
+            jit = False
+
+        if air is not None:
+            model = atmosphere.use_model(atmosphere.load_model(air))
+            log.info(f"Using the atmosphere model {c.param(model)}")
+            if jit:
+                log.warning("Compiled flight kernel only supports the static MSIS profile, meteors will be integrated in pure Python")
+                jit = False
+
+        if adaptive is not None:
+            log.info(f"Using adaptive step size control, {c.num(spf)} steps per frame are ignored")
+            if batch is not None:
+                log.warning("Adaptive integration is not available for batches, meteors will be integrated one by one")
+                batch = None
+
+        if coast is not None:
+            log.info(f"Meteoroids coast through the vacuum above the sensible atmosphere ({c.param(coast)})")
+
+        if gate is not None:
+            log.info(f"Recording only frames brighter than {c.param(gate)}")
+
+        if altitude is not None:
+            log.info(f"Tracking the altitude incrementally ({c.param(altitude)})")
+            if batch is not None:
+                log.warning("Batches always convert the altitude exactly, incremental tracking only applies to coasting")
+
+        if batch is not None:
+            log.info(f"Meteors are integrated in lockstep in batches of {c.num(batch)}")
+
+        return dotmap.DotMap(
+            batch           = batch,
+            gate            = gate,
+            initargs        = (fps, spf, self.streaks, jit, adaptive, coast, gate, air, altitude),
+            _dynamic        = False,
         )
-        self.total_frames   = sum(map(lambda x: len(x.frames), self.meteors))
-        self.total_mass     = sum(map(lambda x: x.mass_initial, self.meteors))
 
-        log.info("Generated {meteoroids} with {frames} frames, total mass {mass}".format(
-            meteoroids      = c.num(len(self.meteors)),
+    def simulate_meteors(self, meteors, settings, *, processes=1, period=1):
+        if settings.batch is None:
+            return parallel(
+                simulate,
+                meteors,
+                initializer     = init_simulate,
+                initargs        = settings.initargs,
+                processes       = min(len(meteors), processes),
+                period          = period,
+                action          = "Simulating meteors",
+            )
+        else:
+            batch = settings.batch
+            batches = [meteors[i:i + batch] for i in range(0, len(meteors), batch)]
+            return [meteor for simulated in parallel(
+                simulate_batch,
+                batches,
+                initializer     = init_simulate,
+                initargs        = settings.initargs,
+                processes       = min(len(batches), processes),
+                period          = period,
+                action          = "Simulating meteor batches",
+            ) for meteor in simulated]
+
+    def log_simulated(self, settings):
+        log.info("Generated {meteoroids} with {frames} frames, total weighted mass {mass}".format(
+            meteoroids      = c.num(self.count),
             frames          = c.num(self.total_frames),
             mass            = c.num("{:6f} kg".format(self.total_mass)),
         ))
+        if settings.gate is not None:
+            dropped = self.total_dropped
+            log.info(f"Dropped {c.num(dropped)} faint frames ({c.num(f'{dropped / max(dropped + self.total_frames, 1):.1%}')})")
 
     def save(self, dataset, *, processes=1, period=1):
         log.info(f"Saving the population to {c.path(dataset.name)}, this might take some time...")
 
-        for meteor in self.meteors:
-            meteor.save(dataset.path('meteors'))
-
+        self.save_meteors(dataset, self.meteors)
         self.save_metadata(dataset)
 
+    def save_meteors(self, dataset, meteors):
+        for meteor in meteors:
+            meteor.save(dataset.path('meteors'))
+
     def save_metadata(self, dataset):
         yaml.dump({
             'timestamp':        datetime.datetime.now().isoformat(),
@@ -110,17 +208,47 @@ def save(meteor):
     return meteor.save(dataset.path('meteors'))
 
 
-def init_simulate(_queue, _fps, _spf, _streaks):
-    global queue, fps, spf, streaks
-    queue, fps, spf, streaks = _queue, _fps, _spf, _streaks
+def init_simulate(_queue, _fps, _spf, _streaks, _jit, _adaptive, _coast, _gate, _air, _altitude):
+    global queue, fps, spf, streaks, jit, adaptive, coast, gate, altitude
+    queue, fps, spf, streaks, jit, adaptive, coast, gate, altitude = _queue, _fps, _spf, _streaks, _jit, _adaptive, _coast, _gate, _altitude
+    # Every worker maps the same table files, so their pages are shared instead of copied
+    atmosphere.use_model(atmosphere.load_model(_air))
 
 
 def simulate(meteor):
-    meteor.fly_constant(fps, spf, method='RK4', wgs84=True)
-    #meteor.fly_adaptive(fps, method='DP', wgs84=True, max_spf=4, error_coarser=1e-6, error_finer=1e-3)
+    if gate is not None:
+        meteor.gate_frames(**gate)
+    if altitude is not None:
+        meteor.track_altitude(**altitude)
+    if coast is not None:
+        meteor.coast(fps, **coast)
+
+    if adaptive is None:
+        meteor.fly_constant(fps, spf, method='RK4', jit=jit)
+    else:
+        meteor.fly_adaptive(fps, method='DP', jit=jit, **adaptive)
     queue.put(1)
 
     if not streaks:
         meteor.reduce_to_point()
 
     return meteor
+
+
+def simulate_batch(meteors):
+    for meteor in meteors:
+        if gate is not None:
+            meteor.gate_frames(**gate)
+        if altitude is not None:
+            meteor.track_altitude(**altitude)
+        if coast is not None:
+            meteor.coast(fps, **coast)
+
+    MeteorBatch(meteors).fly_constant(fps, spf, method='RK4')
+    queue.put(1)
+
+    if not streaks:
+        for meteor in meteors:
+            meteor.reduce_to_point()
+
+    return meteors
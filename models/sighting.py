@@ -30,6 +30,8 @@ class Sighting():
         'absolute_magnitude',
         'is_brightest',
         'is_abs_brightest',
+        'meteor',
+        'weight',
     ]
 
     def __init__(self, observer, meteor):
@@ -38,8 +40,12 @@ class Sighting():
 
         self.timestamp              = self.meteor.timestamp
         self.id                     = "{}{}".format(self.observer.id, self.timestamp)
+        # Meteors saved before importance sampling have no weight
+        self.weight                 = getattr(self.meteor, 'weight', 1.0)
 
-        self.frames                 = [SightingFrame(self.observer, frame) for frame in self.meteor.frames]
+        # The whole trajectory is observed at once, frames only pick their rows
+        view                        = self.observer.geometry.observe(self.meteor.frames.position, self.meteor.frames.velocity)
+        self.frames                 = [SightingFrame(self.observer, frame, view) for frame in self.meteor.frames]
 
         self.first                  = self.frames[0]
         self.last                   = self.frames[-1]
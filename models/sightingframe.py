@@ -1,30 +1,37 @@
-import math
 import logging
-import copy
 import pickle
 import dotmap
 
-from physics import atmosphere, radiometry
+from physics import atmosphere, coord, radiometry
 
 log = logging.getLogger('root')
 
 
 class SightingFrame():
-    def __init__(self, observer, frame):
+    def __init__(self, observer, frame, view=None):
+        """
+            `view` is the observer's View of the entire trajectory (see models.observer.ObserverGeometry.observe),
+            computed once per sighting. Without it, this frame alone is observed.
+        """
         self.observer           = observer
-        self.frame              = copy.copy(frame)
+        # A view into the meteor's trajectory, not a copy
+        self.frame              = frame
 
-        self.alt_az             = observer.alt_az(frame.position)
-        self.relative_position  = self.frame.position - self.observer.position
+        if view is None:
+            trajectory, row = frame.trajectory, slice(frame.index, frame.index + 1)
+            view, index = observer.geometry.observe(trajectory.position[row], trajectory.velocity[row]), 0
+        else:
+            index = frame.index
 
-        dot                     = self.relative_position * self.frame.velocity
-        projection              = dot / (self.relative_position.norm() ** 2) * self.relative_position
-        rejection               = self.frame.velocity - projection
-        self.angular_speed      = math.degrees(rejection.norm() / self.relative_position.norm())
+        self.alt_az             = coord.Vector3D.from_numpy_vector(view.local[index])
+        self.altitude           = float(view.altitude[index])
+        self.azimuth            = float(view.azimuth[index])
+        self.distance           = float(view.distance[index])
+        self.angular_speed      = float(view.angular_speed[index])
 
-        air_mass                = atmosphere.air_mass(self.alt_az.to_spherical().lat, self.observer.position.to_WGS84().alt)
+        air_mass                = atmosphere.air_mass(self.altitude, self.observer.elevation)
         attenuated_power        = atmosphere.attenuate(self.frame.luminous_power, air_mass)
-        self.flux_density       = radiometry.flux_density(attenuated_power, self.alt_az.norm())
+        self.flux_density       = radiometry.flux_density(attenuated_power, self.distance)
 
         self.apparent_magnitude = radiometry.apparent_magnitude(self.flux_density)
         self.absolute_magnitude = self.frame.absolute_magnitude
@@ -48,14 +55,17 @@ class SightingFrame():
         )
 
     def as_tuple(self):
-        relative_position = self.alt_az.to_spherical()
+        """
+            Row of the sighting dataframe. The timestamp column holds the epoch of the trajectory,
+            absolute timestamps are derived from it and the time column by Dataframe in a single pass.
+        """
         return (
-            self.frame.timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f"),
+            self.frame.trajectory.epoch,
             self.frame.time,
-            relative_position.lat,
-            relative_position.lon,
-            relative_position.alt,
-            self.frame.position.elevation_WGS84(),
+            self.altitude,
+            self.azimuth,
+            self.distance,
+            self.frame.altitude,
             self.frame.velocity_altaz.to_spherical().lat,
             self.frame.speed,
             self.angular_speed,
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+import unittest
+import datetime
+import tempfile
+import dotmap
+import numpy as np
+
+from core import dataset
+from models import Generator, Population
+from utilities import utilities
+
+
+def random_config(count, *, seed=20161012):
+    return dotmap.DotMap({
+        'method':                   'random',
+        'seed':                     seed,
+        'parameters': {
+            'count':                count,
+            'shape': {
+                'drag_coefficient': {'distribution': 'constant', 'parameters': {'value': 0.6}},
+                'shapeFactor':      1.21,
+            },
+            'material': {
+                'density':          {'distribution': 'constant', 'parameters': {'value': 625}},
+                'heat_transfer':    0.5,
+                'ablation_heat':    6000000,
+            },
+            'mass':                 {'distribution': 'pareto', 'parameters': {'minimum': 1e-3, 'shape': 1.8}},
+            'position': {
+                'distribution':     'pillow',
+                'parameters':       {'south': 45, 'north': 53, 'west': 14, 'east': 26, 'bottom': 130000, 'top': 150000},
+            },
+            'velocity':             {'distribution': 'shower', 'parameters': {'ra': 43, 'dec': 56, 'speed': 59000}},
+            'time': {
+                'distribution':     'uniform',
+                'parameters':       {'begin': datetime.datetime(2016, 8, 11, 19), 'end': datetime.datetime(2016, 8, 12, 2)},
+            },
+        },
+    })
+
+
+def grid_config():
+    return dotmap.DotMap({
+        'method':                   'grid',
+        'parameters': {
+            'shape':                {'drag_coefficient': 0.5, 'shape_factor': 1.21},
+            'material':             {'density': 600, 'heat_transfer': 1.0, 'ablation_heat': 6000000},
+            'mass':                 {'min': 1e-12, 'max': 1e-6, 'count': 5, 'spacing': 'log'},
+            'position':             {'latitude': 90, 'longitude': 90, 'elevation': 150000},
+            'velocity':             {'ra': 0, 'dec': 90, 'speed': {'min': 70000, 'max': 500000, 'count': 4, 'spacing': 'log'}},
+            'time':                 datetime.datetime(2016, 6, 21),
+        },
+    })
+
+
+def fingerprint(meteors):
+    return [(meteor.mass, meteor.timestamp, *meteor.position.as_numpy_vector(), *meteor.velocity.as_numpy_vector()) for meteor in meteors]
+
+
+class CaseDictGrid(unittest.TestCase):
+    def setUp(self):
+        self.axes = dict(a=[1, 2, 3], b=['x', 'y'], c=[0.5, 1.5, 2.5, 3.5, 4.5])
+        self.grid = utilities.DictGrid(**self.axes)
+
+    def test_matches_product(self):
+        product = list(utilities.dict_product(**self.axes))
+        self.assertEqual(len(self.grid), len(product))
+        for index, point in enumerate(product):
+            self.assertEqual(self.grid[index], point)
+        self.assertEqual(self.grid[-1], product[-1])
+
+    def test_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.grid[len(self.grid)]
+
+    def test_shards_cover_grid(self):
+        # 30 points: evenly divisible, not divisible, and more shards than points
+        for count in (1, 3, 7, 30, 45):
+            indices = [index for shard in range(count) for index in self.grid.shard(shard, count)]
+            self.assertEqual(indices, list(range(len(self.grid))))
+
+        sizes = [len(self.grid.shard(shard, 7)) for shard in range(7)]
+        self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+
+class CaseGeneratorGrid(unittest.TestCase):
+    def test_shards_generate_grid(self):
+        full = Generator.from_config(grid_config())
+        expected = fingerprint(full.generate())
+        self.assertEqual(len(expected), 20)
+
+        meteors = []
+        for shard in range(3):
+            generator = Generator.from_config(grid_config())
+            generator.select_shard(shard, 3)
+            meteors += generator.generate()
+            self.assertEqual(generator.count, len(generator.indices))
+        self.assertEqual(fingerprint(meteors), expected)
+
+
+class CaseGeneratorRandom(unittest.TestCase):
+    def make(self, count):
+        generator = Generator.from_config(random_config(count))
+        # Small blocks, so that a population spans several of them
+        generator.CHUNK = 64
+        return generator
+
+    def test_count(self):
+        generator = self.make(150)
+        self.assertEqual(len(generator.generate()), 150)
+        self.assertEqual(generator.count, 150)
+
+    def test_iterations(self):
+        """ Iterations are the number of candidates a one-by-one acceptance test would have drawn """
+        generator = self.make(150)
+        generator.generate()
+
+        accepted, block = [], 0
+        while sum(accepted) < 150:
+            candidates, indices = generator.generate_chunk(block)
+            mask = np.zeros(generator.CHUNK, dtype=bool)
+            mask[indices] = True
+            accepted += mask.tolist()
+            block += 1
+        self.assertEqual(generator.iterations, int(np.flatnonzero(accepted)[149]) + 1)
+
+    def test_chunks_match_generate(self):
+        expected = fingerprint(self.make(150).generate())
+        for size in (1, 7, 64, 150, 1000):
+            generator = self.make(150)
+            chunks = list(generator.chunks(size))
+            self.assertTrue(all(len(chunk) == size for chunk in chunks[:-1]))
+            self.assertEqual(fingerprint([meteor for chunk in chunks for meteor in chunk]), expected)
+
+
+class CasePopulationStream(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_dataset(self, name):
+        data = dataset.DataManager(name, root=self.directory.name)
+        data.reset_meteors()
+        return data
+
+    def test_stream_matches_simulate(self):
+        whole = Population(random_config(12))
+        whole.generate()
+        whole.simulate(20, 1)
+
+        streamed = Population(random_config(12))
+        data = self.make_dataset('streamed')
+        streamed.stream(data, 20, 1, chunk=5)
+
+        self.assertEqual((streamed.count, streamed.iterations), (whole.count, whole.iterations))
+        self.assertEqual(streamed.total_frames, whole.total_frames)
+        self.assertAlmostEqual(streamed.total_mass, whole.total_mass, delta=1e-12)
+        self.assertEqual(len(data.list('meteors')), 12)
+        self.assertTrue(data.exists('meteors.yaml'))
+
+
+if __name__ == '__main__':
+    unittest.main()
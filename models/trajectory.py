@@ -0,0 +1,204 @@
+import datetime
+import math
+import numpy as np
+
+from models.frame import Frame
+from physics import atmosphere, coord, radiometry
+
+
+class Trajectory:
+    """
+        Frames of a single meteor flight, stored column-wise in one preallocated float64 array
+        that grows by doubling. Columns are available as NumPy views, single frames as lightweight
+        `Frame` views, so that neither is copied. Properties that are constant over the flight
+        (initial mass, bulk density, ablation heat) and the epoch are stored only once.
+
+        Only the raw state is recorded by the integrator. Derived quantities (luminous power, magnitude,
+        air density, velocity in local alt-az...) are computed in one vectorised pass on first access
+        and cached until the trajectory changes.
+    """
+    COLUMNS = ('time', 'x', 'y', 'z', 'vx', 'vy', 'vz', 'mass', 'mass_change')
+
+    TIME, X, Y, Z, VX, VY, VZ, MASS, MASS_CHANGE = range(len(COLUMNS))
+
+    def __init__(self, *, epoch, mass_initial, density, ablation_heat, air=None, capacity=64):
+        self.epoch              = epoch
+        self.mass_initial       = mass_initial
+        self.density            = density
+        self.ablation_heat      = ablation_heat
+        # Configuration of the atmosphere model used for the flight, see atmosphere.resolve_model
+        self.air                = air
+
+        self.data               = np.empty((capacity, len(self.COLUMNS)))
+        self.count              = 0
+        self.cache              = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Frame(self, i) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"Frame {index} out of range for a trajectory of {self.count} frames")
+        return Frame(self, index)
+
+    def __iter__(self):
+        return (Frame(self, index) for index in range(self.count))
+
+    def __getstate__(self):
+        # Do not pickle the unused capacity nor the derived quantities
+        state = self.__dict__.copy()
+        state['data'] = self.data[:self.count].copy()
+        state['cache'] = {}
+        return state
+
+    def reserve(self, count):
+        """ Make sure there is room for `count` more frames """
+        if self.count + count > len(self.data):
+            data = np.empty((max(2 * len(self.data), self.count + count), len(self.COLUMNS)))
+            data[:self.count] = self.data[:self.count]
+            self.data = data
+
+    def append(self, meteor):
+        """ Append the current state of `meteor` as a new frame """
+        self.reserve(1)
+        row = self.data[self.count]
+        position, velocity = meteor.position, meteor.velocity
+        row[self.TIME]                  = meteor.time
+        row[self.X]                     = position.x
+        row[self.Y]                     = position.y
+        row[self.Z]                     = position.z
+        row[self.VX]                    = velocity.x
+        row[self.VY]                    = velocity.y
+        row[self.VZ]                    = velocity.z
+        row[self.MASS]                  = meteor.mass
+        row[self.MASS_CHANGE]           = meteor.mass_change
+        self.count += 1
+        self.cache.clear()
+
+    def extend(self, rows):
+        """ Append frames given as an array with one row per frame, in the order of COLUMNS """
+        self.reserve(len(rows))
+        self.data[self.count:self.count + len(rows)] = rows
+        self.count += len(rows)
+        self.cache.clear()
+
+    def remove(self, start, stop):
+        """ Remove frames start to stop - 1, shifting the following ones down """
+        if stop <= start:
+            return
+        tail = self.count - stop
+        self.data[start:start + tail] = self.data[stop:self.count]
+        self.count -= stop - start
+        self.cache.clear()
+
+    def take(self, indices):
+        """ Return a new trajectory with only the frames at `indices` """
+        trajectory = Trajectory(
+            epoch               = self.epoch,
+            mass_initial        = self.mass_initial,
+            density             = self.density,
+            ablation_heat       = self.ablation_heat,
+            air                 = self.air,
+            capacity            = max(len(indices), 1),
+        )
+        trajectory.data[:len(indices)] = self.data[indices]
+        trajectory.count = len(indices)
+        return trajectory
+
+    def timestamp(self, index):
+        return self.epoch + datetime.timedelta(seconds=float(self.data[index, self.TIME]))
+
+    def column(self, index):
+        return self.data[:self.count, index]
+
+    def cached(self, name, function):
+        if name not in self.cache:
+            self.cache[name] = function()
+        return self.cache[name]
+
+    @property
+    def time(self):
+        return self.data[:self.count, self.TIME]
+
+    @property
+    def position(self):
+        """ N × 3 view of the ECEF positions """
+        return self.data[:self.count, self.X:self.Z + 1]
+
+    @property
+    def velocity(self):
+        """ N × 3 view of the ECEF velocities """
+        return self.data[:self.count, self.VX:self.VZ + 1]
+
+    @property
+    def mass(self):
+        return self.data[:self.count, self.MASS]
+
+    @property
+    def mass_change(self):
+        return self.data[:self.count, self.MASS_CHANGE]
+
+    @property
+    def speed(self):
+        return self.cached('speed', lambda: np.linalg.norm(self.velocity, axis=1))
+
+    @property
+    def luminous_power(self):
+        return self.cached('luminous_power', lambda: -(radiometry.luminous_efficiency_array(self.speed) * self.mass_change * self.speed**2 / 2.0))
+
+    @property
+    def absolute_magnitude(self):
+        return self.cached('absolute_magnitude', lambda: radiometry.absolute_magnitude_array(self.luminous_power))
+
+    @property
+    def geodetic(self):
+        """ WGS84 latitude, longitude and altitude above the ellipsoid, as a tuple of arrays """
+        return self.cached('geodetic', lambda: coord.ecef_to_wgs84_array(*self.position.T))
+
+    @property
+    def latitude(self):
+        return self.geodetic[0]
+
+    @property
+    def altitude(self):
+        """ WGS84 altitude above the ellipsoid """
+        return self.geodetic[2]
+
+    @property
+    def air_density(self):
+        model = atmosphere.resolve_model(self.air)
+        return self.cached('air_density', lambda: model.density(self.altitude, self.latitude, atmosphere.day_of_year(self.epoch)))
+
+    @property
+    def velocity_altaz(self):
+        """ N × 3 array of velocities in the local alt-az frames """
+        return self.cached('velocity_altaz', lambda: coord.dxdydz_to_altaz_array(self.velocity, self.position))
+
+    @property
+    def radius(self):
+        return ((3 * self.mass) / (4 * np.pi * self.density))**(1 / 3)
+
+    @property
+    def reynolds_number(self):
+        return atmosphere.Reynolds_number(2 * self.radius, self.speed, self.air_density)
+
+    @property
+    def dynamic_pressure(self):
+        return self.air_density * self.speed**2
+
+    def luminous_power_at(self, index):
+        """ Luminous power of a single frame, without computing the whole column if it is not cached yet """
+        if 'luminous_power' in self.cache:
+            return float(self.cache['luminous_power'][index])
+        row = self.data[index]
+        speed = math.sqrt(row[self.VX]**2 + row[self.VY]**2 + row[self.VZ]**2)
+        return float(-(radiometry.luminous_efficiency(speed) * row[self.MASS_CHANGE] * speed**2 / 2.0))
+
+    def absolute_magnitude_at(self, index):
+        if 'absolute_magnitude' in self.cache:
+            return float(self.cache['absolute_magnitude'][index])
+        return radiometry.absolute_magnitude(self.luminous_power_at(index))
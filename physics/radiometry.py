@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 from physics import constants
 
@@ -39,3 +40,30 @@ def apparent_magnitude(flux_density: float) -> float:
     return constants.APPARENT_MAGNITUDE_ONE_WM2 - 2.5 * math.log10(flux_density)
 
 
+def excitation_coefficient_array(speed):
+    """ Vectorised version of `excitation_coefficient`, accepts an array of speeds in m/s """
+    speed = np.asarray(speed, dtype=float)
+    return np.select(
+        [speed < 6200, speed < 20000, speed < 60000, speed < 100000],
+        [
+            0,
+            (-2.1887e-9 + 4.2903e-13 * speed - 1.2447e-17 * speed**2) * speed**2,
+            2.37044e-6 * speed**1.25,
+            -12.835 + speed * (6.7672e-4 + speed * (-1.163076e-8 + speed * (9.191681e-14 + speed * -2.7465805e-19))),
+        ],
+        1.615 + speed * 1.3725e-5,
+    )
+
+
+def luminous_efficiency_array(speed):
+    """ Vectorised version of `luminous_efficiency` """
+    speed = np.asarray(speed, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(speed > 1000, 2 * 7.668e6 * excitation_coefficient_array(speed) / speed**2, 0)
+
+
+def absolute_magnitude_array(flux):
+    """ Vectorised version of `absolute_magnitude`, zero flux maps to -inf as in the scalar version """
+    flux = np.asarray(flux, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(flux == 0, -np.inf, constants.ABSOLUTE_MAGNITUDE_ONE_WATT - 2.5 * np.log10(flux))
@@ -10,10 +10,15 @@ wgs84_module = Extension('_wgs84',
     sources=['wgs84_wrap.c', 'wgs84.c'],
 )
 
+# Plain shared library with the array conversions, loaded through ctypes by physics/coord.py
+wgs84_arrays = Extension('_wgs84_arrays',
+    sources=['wgs84.c'],
+)
+
 setup(name='wgs84',
     version='0.1',
     author="Kvík",
     description="""WGS84 utilities for ASMODEUS""",
-    ext_modules=[wgs84_module],
+    ext_modules=[wgs84_module, wgs84_arrays],
     py_modules=["wgs84"],
 )
@@ -1,13 +1,35 @@
 #!/usr/bin/env python
 import unittest, math, datetime
+import tempfile
+import pickle
 import random
+import dotmap
 import numpy as np
 
 from physics import atmosphere, coord, constants, radiometry
 from core import dataset
-from models import observer, meteor, sighting
+from models import observer, meteor, frame, trajectory, dataframe
 from discriminator import magnitude
 
+
+EPOCH = datetime.datetime(2016, 8, 12, 0, 0, 0)
+
+
+def make_meteor(*, mass=1e-3, speed=40000, altitude=120000, target=None, velocity=None):
+    """
+        Test meteoroid of density 800 kg/m³ at EPOCH above 48° N 17° E. It falls vertically at `speed`,
+        or from WGS84 `altitude` towards the ground point `target` (latitude, longitude), or with an explicit `velocity`.
+    """
+    if target is None:
+        position = coord.Vector3D.from_geodetic(48, 17, altitude)
+        direction = -position.unit()
+    else:
+        position = coord.Vector3D.from_WGS84(48, 17, altitude)
+        direction = (coord.Vector3D.from_WGS84(*target, 0) - position).unit()
+    velocity = direction * speed if velocity is None else velocity
+    return meteor.Meteor(mass=mass, density=800, position=position, velocity=velocity, timestamp=EPOCH)
+
+
 class CaseAtmosphere(unittest.TestCase):
     def testAirmass90(self):
         self.assertAlmostEqual(atmosphere.air_mass(90), 1, delta = 0.001)
@@ -24,6 +46,19 @@ class CaseAtmosphere(unittest.TestCase):
     def testDensity10km(self):
         self.assertAlmostEqual(atmosphere.air_density(10000), 0.42, delta = 0.01)
 
+    def testDensityArray(self):
+        altitudes = np.array([-100, 0, 12345.6, 85000, 499999, 500000, 600000])
+        np.testing.assert_array_equal(atmosphere.air_density(altitudes), [atmosphere.air_density(float(h)) for h in altitudes])
+
+    def testDensitySplineKnots(self):
+        altitudes = np.arange(0, 500000, 500.0)
+        np.testing.assert_allclose(atmosphere.air_density_spline(altitudes), atmosphere.air_density(altitudes), rtol = 1e-12)
+
+    def testDensitySplineDerivative(self):
+        density, slope = atmosphere.air_density_spline(85250.0, derivative = True)
+        numerical = (atmosphere.air_density_spline(85251.0) - atmosphere.air_density_spline(85249.0)) / 2
+        self.assertAlmostEqual(slope / numerical, 1, delta = 1e-6)
+
     def testAttenuate_1_1(self):
         self.assertEqual(atmosphere.attenuate(1, 1), math.exp(constants.ATTENUATION_ONE_AIR_MASS))
 
@@ -34,6 +69,89 @@ class CaseAtmosphere(unittest.TestCase):
         self.assertEqual(atmosphere.attenuate(5, 3), 5 * math.exp(constants.ATTENUATION_ONE_AIR_MASS * 3))
 
 
+class CaseGriddedAtmosphere(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        altitude = np.arange(0, 500000, 500.0)
+        latitude = np.array([-90.0, 0.0, 90.0])
+        day = np.array([0.0, 183.0, 366.0])
+        flux = np.array([70.0, 250.0])
+        # Linear in every axis but altitude, so that multilinear interpolation is exact
+        log_density = (np.log(atmosphere.air_density(altitude))[:, None, None, None]
+                       + 1e-3 * latitude[None, :, None, None] + 1e-4 * day[None, None, :, None] + 1e-3 * flux[None, None, None, :])
+        atmosphere.GriddedModel.save(self.directory.name, altitude=altitude, latitude=latitude, day=day, flux=flux, log_density=log_density)
+        self.model = atmosphere.GriddedModel(self.directory.name, flux=150)
+
+    def tearDown(self):
+        atmosphere.use_model(atmosphere.MSISModel())
+        self.directory.cleanup()
+
+    def expected(self, altitude, latitude, day, flux):
+        return atmosphere.air_density(altitude) * np.exp(1e-3 * latitude + 1e-4 * day + 1e-3 * flux)
+
+    def test_memory_mapped(self):
+        self.assertIsInstance(self.model.log_density, np.memmap)
+
+    def test_density_array(self):
+        altitude = np.array([0, 12345.6, 85000, 85250, 499000])
+        latitude = np.array([-45, 0, 48.2, 90, 13])
+        day = np.array([0, 100.5, 224, 366, 17])
+        np.testing.assert_allclose(self.model.density(altitude, latitude, day), self.expected(altitude, latitude, day, 150), rtol=1e-12)
+
+    def test_clamped(self):
+        self.assertAlmostEqual(self.model.density(85000, 0, 0, 1000) / self.expected(85000, 0, 0, 250), 1, delta=1e-12)
+        self.assertEqual(self.model.density(600000, 0, 0), 0)
+
+    def test_profile_matches_array(self):
+        profile = self.model.profile(day=224.3)
+        for altitude, latitude in [(0, 0), (85250.5, 48.2), (120000, -10), (499000, 90)]:
+            self.assertAlmostEqual(profile(altitude, latitude) / self.model.density(altitude, latitude, 224.3), 1, delta=1e-12)
+        self.assertEqual(profile(600000, 0), 0)
+
+    def test_altitude_inverts_density(self):
+        density = self.model.density(85250.5, 48.2, 224.3)
+        self.assertAlmostEqual(self.model.altitude(density, 48.2, 224.3), 85250.5, delta=1e-2)
+        # The static profile has an exact inverse, the bisection agrees with it
+        msis = atmosphere.MSISModel()
+        self.assertAlmostEqual(atmosphere.AtmosphereModel.altitude(msis, 1e-7), msis.altitude(1e-7), delta=1e-2)
+
+    def test_shape_mismatch(self):
+        np.save(f"{self.directory.name}/flux.npy", np.array([70.0, 150.0, 250.0]))
+        with self.assertRaises(ValueError):
+            atmosphere.GriddedModel(self.directory.name)
+
+    def test_day_of_year(self):
+        self.assertEqual(atmosphere.day_of_year(datetime.datetime(2016, 1, 1)), 0)
+        self.assertEqual(atmosphere.day_of_year(datetime.datetime(2016, 2, 1, 12)), 31.5)
+
+    def test_flight(self):
+        """ Scalar and batch flights agree with the gridded model, and differ from the static profile """
+        static = make_meteor(speed=30000)
+        static.fly_constant(20, 2, method='RK4')
+
+        atmosphere.use_model(self.model)
+        scalar, batch = make_meteor(speed=30000), make_meteor(speed=30000)
+        scalar.fly_constant(20, 2, method='RK4', jit=True)
+        meteor.MeteorBatch([batch]).fly_constant(20, 2, method='RK4')
+
+        self.assertAlmostEqual(scalar.log_mass, batch.log_mass, delta=1e-9)
+        self.assertAlmostEqual((scalar.position - batch.position).norm(), 0, delta=1e-6)
+        self.assertGreater((scalar.position - static.position).norm(), 1)
+        density = scalar.frames.air_density[10]
+        self.assertAlmostEqual(density / self.model.density(scalar.frames.altitude[10], scalar.frames.latitude[10], 224), 1, delta=1e-12)
+
+    def test_trajectory_keeps_model(self):
+        """ Derived air density uses the model of the flight, also in a process where another model is active """
+        body = make_meteor(speed=30000)
+        atmosphere.use_model(self.model)
+        body.fly_constant(20, 2, method='RK4')
+        expected = self.model.density(body.frames.altitude, body.frames.latitude, atmosphere.day_of_year(body.epoch))
+
+        atmosphere.use_model(atmosphere.MSISModel())
+        frames = pickle.loads(pickle.dumps(body.frames))
+        np.testing.assert_allclose(frames.air_density, expected, rtol=1e-12)
+
+
 class CaseRadiometry(unittest.TestCase):
     def testFluxDensityZero(self):
         self.assertEqual(radiometry.flux_density(0, 1), 0)
@@ -73,6 +191,244 @@ class CaseRadiometry(unittest.TestCase):
 #        pass
 
 
+class CaseDiff(unittest.TestCase):
+    def setUp(self):
+        self.a = meteor.Diff(1, 2, 3, 4, 5, 6, 7)
+        self.b = meteor.Diff(7, 6, 5, 4, 3, 2, 1)
+
+    def test_combination_matches_operators(self):
+        fused = meteor.Diff().set_combination((0.5, self.a), (2, self.b))
+        allocated = self.a * 0.5 + self.b * 2
+        for slot in meteor.Diff.__slots__:
+            self.assertEqual(getattr(fused, slot), getattr(allocated, slot))
+
+    def test_advance(self):
+        state = meteor.State(0, 0, 0, 1, 1, 1, 0).advance(self.a, 0.5)
+        self.assertEqual((state.x, state.vz, state.log_mass), (0.5, 4, 3.5))
+
+
+class CaseMeteorBatch(unittest.TestCase):
+    def make_meteors(self):
+        return [make_meteor(mass=mass, speed=speed) for mass, speed in [(1e-3, 30000), (1e-5, 60000), (1, 15000)]]
+
+    def test_batch_matches_scalar(self):
+        scalar = self.make_meteors()
+        batch = self.make_meteors()
+        for m in scalar:
+            m.fly_constant(20, 2, method='RK4')
+        meteor.MeteorBatch(batch).fly_constant(20, 2, method='RK4')
+
+        for a, b in zip(scalar, batch):
+            self.assertEqual(len(a.frames), len(b.frames))
+            self.assertAlmostEqual((a.frames[-1].position - b.frames[-1].position).norm(), 0, delta=1e-6)
+            self.assertAlmostEqual(a.frames[-1].absolute_magnitude, b.frames[-1].absolute_magnitude, delta=1e-6)
+            self.assertAlmostEqual(a.log_mass, b.log_mass, delta=1e-9)
+            self.assertEqual(a.step, b.step)
+            np.testing.assert_allclose(a.frames.data[:len(a.frames)], b.frames.data[:len(b.frames)], rtol=1e-9)
+
+    def test_batch_gated_matches_scalar(self):
+        scalar = self.make_meteors()
+        batch = self.make_meteors()
+        for m in scalar + batch:
+            m.gate_frames(magnitude=5, margin=1)
+        for m in scalar:
+            m.fly_constant(20, 2, method='RK4')
+        meteor.MeteorBatch(batch).fly_constant(20, 2, method='RK4')
+
+        for a, b in zip(scalar, batch):
+            self.assertEqual(len(a.frames), len(b.frames))
+            self.assertEqual(a.frames_dropped, b.frames_dropped)
+            np.testing.assert_allclose(a.frames.time, b.frames.time, rtol=1e-9)
+
+
+class CaseKernel(unittest.TestCase):
+    def test_kernel_matches_python(self):
+        python, compiled = make_meteor(), make_meteor()
+        python.fly_constant(20, 4, method='RK4')
+        compiled.fly_compiled(20, 4, method='RK4')
+
+        self.assertEqual(len(python.frames), len(compiled.frames))
+        self.assertEqual(python.step, compiled.step)
+        self.assertAlmostEqual((python.position - compiled.position).norm(), 0, delta=1e-6)
+        self.assertAlmostEqual(python.frames[-1].absolute_magnitude, compiled.frames[-1].absolute_magnitude, delta=1e-9)
+
+    def test_adaptive_kernel_matches_python(self):
+        python, compiled = [make_meteor(mass=1e-2, speed=50000, altitude=130000) for _ in range(2)]
+        python.fly_adaptive(20)
+        compiled.fly_adaptive_compiled(20, rtol=meteor.ADAPTIVE_RTOL, atol=meteor.ADAPTIVE_ATOL, dt_min=1e-9, dt_max=math.inf)
+
+        self.assertEqual(len(python.frames), len(compiled.frames))
+        self.assertEqual((python.step, python.rejected), (compiled.step, compiled.rejected))
+        self.assertAlmostEqual((python.position - compiled.position).norm(), 0, delta=1e-6)
+        np.testing.assert_allclose(python.frames.time, compiled.frames.time, rtol=1e-12)
+
+
+class CaseAdaptive(unittest.TestCase):
+    def make_meteor(self):
+        return make_meteor(mass=1e-2, speed=50000, altitude=130000)
+
+    def test_adaptive_matches_fine_constant(self):
+        reference, adaptive = self.make_meteor(), self.make_meteor()
+        reference.fly_constant(20, 100, method='RK4')
+        adaptive.fly_adaptive(20)
+
+        self.assertEqual(len(reference.frames), len(adaptive.frames))
+        self.assertLess(adaptive.step, reference.step / 10)
+        for ref, ada in zip(reference.frames, adaptive.frames):
+            self.assertAlmostEqual(ref.time, ada.time, delta=1e-9)
+            self.assertAlmostEqual((ref.position - ada.position).norm(), 0, delta=0.1)
+
+    def test_dense_output_endpoints(self):
+        body = self.make_meteor()
+        body.allocate_stages()
+        body.evaluate(body.state, meteor.DIFF_ZERO, 0, body.stages[0])
+        solution, _ = body.step_DP_adaptive(body.state, 0.01, fsal=True)
+        end = meteor.State().set_advanced(body.state, solution, 0.01)
+
+        start = body.dense_output(body.state, 0.01, 0, meteor.State())
+        self.assertAlmostEqual((start.position - body.state.position).norm(), 0, delta=1e-6)
+        finish = body.dense_output(body.state, 0.01, 1, meteor.State())
+        self.assertAlmostEqual((finish.position - end.position).norm(), 0, delta=1e-6)
+        self.assertAlmostEqual(finish.log_mass, end.log_mass, delta=1e-12)
+
+    def test_frame_rate_does_not_change_steps(self):
+        slow, fast = self.make_meteor(), self.make_meteor()
+        slow.fly_adaptive(10)
+        fast.fly_adaptive(100)
+        self.assertLess(abs(slow.step - fast.step), 5)
+        self.assertGreater(len(fast.frames), 5 * len(slow.frames))
+
+    def test_controller_shrinks_on_rejection(self):
+        controller = meteor.StepController()
+        self.assertLess(controller.propose(1, 10, accepted=False), 1)
+        self.assertLessEqual(controller.propose(1, 0.5, accepted=True), 1)
+        self.assertGreater(controller.propose(1, 0.01, accepted=True), 1)
+
+
+class CaseEvents(unittest.TestCase):
+    def make_meteor(self):
+        return make_meteor(mass=1e-5, speed=60000)
+
+    def test_burnout_located_constant(self):
+        body = self.make_meteor()
+        body.fly_constant(20, 2, method='RK4')
+        self.assertAlmostEqual(body.log_mass, meteor.TERMINAL_LOG_MASS, delta=1e-9)
+        self.assertLess(body.time, body.step / 40)
+
+    def test_burnout_located_adaptive(self):
+        body = self.make_meteor()
+        body.fly_adaptive(20)
+        self.assertAlmostEqual(body.log_mass, meteor.TERMINAL_LOG_MASS, delta=1e-9)
+        self.assertLessEqual(body.frames[-1].time, body.time)
+
+    def test_impact_bound(self):
+        above = meteor.State.from_vectors(coord.Vector3D.from_WGS84(0, 0, 100), coord.Vector3D(0, 0, 0), 0)
+        below = meteor.State.from_vectors(coord.Vector3D.from_WGS84(90, 0, -100), coord.Vector3D(0, 0, 0), 0)
+        self.assertGreater(meteor.event_impact(above), 0)
+        self.assertAlmostEqual(meteor.event_impact(below), -100, delta=1e-6)
+
+
+class CaseCoast(unittest.TestCase):
+    def make_meteor(self):
+        return make_meteor(mass=1e-4, speed=60000, altitude=140000, target=(47.5, 17.2))
+
+    def test_coast_then_fly_matches_fly(self):
+        reference, coasted = self.make_meteor(), self.make_meteor()
+        reference.fly_constant(20, 10, method='RK4')
+        coasted.coast(20)
+        self.assertGreater(coasted.time, 0)
+        self.assertGreater(coasted.position.to_WGS84().alt, meteor.COAST_ALTITUDE)
+        coasted.fly_constant(20, 10, method='RK4')
+
+        self.assertEqual(len(reference.frames), len(coasted.frames))
+        for ref, coa in zip(reference.frames, coasted.frames):
+            self.assertAlmostEqual(ref.time, coa.time, delta=1e-9)
+            self.assertAlmostEqual((ref.position - coa.position).norm(), 0, delta=10)
+        self.assertAlmostEqual(reference.frames[-1].absolute_magnitude, coasted.frames[-1].absolute_magnitude, delta=0.1)
+
+    def test_coast_without_frames(self):
+        body = self.make_meteor()
+        body.coast(20, density=atmosphere.air_density(120000), frames=False)
+        self.assertEqual(len(body.frames), 0)
+        self.assertGreater(body.time, 0)
+
+
+class CaseFrameGate(unittest.TestCase):
+    def make_meteor(self):
+        return make_meteor(mass=1e-4, speed=30000, altitude=140000, target=(47.5, 17.2))
+
+    def test_gated_frames_are_bright_subset(self):
+        full, gated = self.make_meteor(), self.make_meteor()
+        full.fly_constant(20, 4, method='RK4')
+        gated.gate_frames(magnitude=5, margin=1)
+        gated.fly_constant(20, 4, method='RK4')
+
+        times = [frame.time for frame in gated.frames]
+        bright = [frame.time for frame in full.frames if frame.absolute_magnitude <= 5]
+        self.assertTrue(bright)
+        self.assertTrue(set(bright) <= set(times))
+        self.assertEqual(times[0], full.frames[0].time)
+        self.assertEqual(times[-1], full.frames[-1].time)
+        self.assertLess(len(gated.frames), len(full.frames))
+        self.assertEqual(len(gated.frames) + gated.frames_dropped, len(full.frames))
+
+    def test_margin(self):
+        gate = frame.FrameGate(power=1, margin=2)
+        frames = trajectory.Trajectory(epoch=datetime.datetime(2016, 8, 12), mass_initial=1, density=800, ablation_heat=1)
+        for time, mass_change in enumerate([-1e-12, -1e-12, -1e-12, -1e-12, -1, -1e-12, -1e-12, -1e-12, -1e-12]):
+            frames.append(dotmap.DotMap(
+                time=time, position=coord.Vector3D(0, 0, 0), velocity=coord.Vector3D(0, 0, 30000),
+                mass=1, mass_change=mass_change,
+            ))
+            gate.push(frames)
+        gate.close(frames)
+        self.assertEqual(list(frames.time), [0, 2, 3, 4, 5, 6, 8])
+        self.assertEqual(gate.dropped, 2)
+
+
+class CaseTrajectory(unittest.TestCase):
+    def test_columns_are_views(self):
+        body = make_meteor()
+        body.fly_constant(20, 4, method='RK4')
+        frames = body.frames
+
+        self.assertTrue(np.shares_memory(frames.position, frames.data))
+        self.assertEqual(frames.position.shape, (len(frames), 3))
+        self.assertEqual(frames[-1].position, coord.Vector3D(*frames.position[-1]))
+        self.assertEqual(frames[1].timestamp, datetime.datetime(2016, 8, 12, 0, 0, 0, 50000))
+        self.assertAlmostEqual(frames[0].speed, 40000, delta=1e-6)
+
+        body.reduce_to_point()
+        self.assertEqual(len(body.frames), 1)
+        self.assertEqual(body.frames[0].luminous_power, frames.luminous_power.max())
+
+    def test_derived_quantities_match_scalar(self):
+        body = make_meteor(velocity=coord.Vector3D(-10000, 30000, -20000))
+        body.fly_constant(20, 4, method='RK4')
+        last = body.frames[-2]
+        speed = last.velocity.norm()
+        power = -(radiometry.luminous_efficiency(speed) * last.mass_change * speed**2 / 2.0)
+
+        self.assertAlmostEqual(last.luminous_power, power, delta=abs(power) * 1e-12)
+        self.assertAlmostEqual(last.absolute_magnitude, radiometry.absolute_magnitude(power), delta=1e-9)
+        self.assertAlmostEqual((last.velocity_altaz - last.velocity.dxdydz_to_altaz_at(last.position)).norm(), 0, delta=1e-6)
+        self.assertAlmostEqual(last.air_density, atmosphere.air_density(last.position.to_WGS84().alt), delta=1e-12)
+
+    def test_timestamps_from_epoch(self):
+        epoch = datetime.datetime(2016, 8, 12, 23, 59, 59, 900000)
+        formatted = dataframe.Dataframe.timestamps([epoch, epoch], [0.05, 1 / 3])
+        self.assertEqual(list(formatted), [
+            (epoch + datetime.timedelta(seconds=0.05)).strftime("%Y-%m-%dT%H:%M:%S.%f"),
+            (epoch + datetime.timedelta(seconds=1 / 3)).strftime("%Y-%m-%dT%H:%M:%S.%f"),
+        ])
+
+    def test_clock_is_float_offset(self):
+        body = make_meteor()
+        body.fly_constant(20, 3, method='RK4')
+        self.assertEqual(body.epoch, EPOCH)
+        self.assertEqual(body.timestamp, EPOCH + datetime.timedelta(seconds=body.time))
+
+
 class CaseVector3D(unittest.TestCase):
     def setUp(self):
         self.a = coord.Vector3D(57, 38, 49)
@@ -144,6 +500,105 @@ class CaseVector3D(unittest.TestCase):
             self.assertAlmostEqual(z, v.z, delta=1e-6)
 
 
+class CaseVector3DArray(unittest.TestCase):
+    def setUp(self):
+        self.vectors = [coord.Vector3D(57, 38, 49), coord.Vector3D(14, 33, 50), coord.Vector3D(-3, 0.5, 1e6)]
+        self.others = [coord.Vector3D(1, 2, 3), coord.Vector3D(-7, 0, 2), coord.Vector3D(0.1, 0.2, -0.3)]
+        self.array = coord.Vector3DArray.from_vectors(self.vectors)
+        self.other = coord.Vector3DArray.from_vectors(self.others)
+
+    def assertVectors(self, array, vectors):
+        np.testing.assert_allclose(array.data, [(v.x, v.y, v.z) for v in vectors], rtol=1e-14)
+
+    def test_operators_match_scalar(self):
+        self.assertVectors(self.array + self.other, [a + b for a, b in zip(self.vectors, self.others)])
+        self.assertVectors(self.array - self.other, [a - b for a, b in zip(self.vectors, self.others)])
+        self.assertVectors(self.array ^ self.other, [a ^ b for a, b in zip(self.vectors, self.others)])
+        self.assertVectors(-self.array * 2.5, [-a * 2.5 for a in self.vectors])
+        self.assertVectors(self.array / 4, [a / 4 for a in self.vectors])
+        np.testing.assert_allclose(self.array * self.other, [a * b for a, b in zip(self.vectors, self.others)])
+        np.testing.assert_allclose(self.array.norm(), [a.norm() for a in self.vectors])
+
+    def test_single_vector(self):
+        single = self.others[0]
+        self.assertVectors(single - self.array, [single - a for a in self.vectors])
+        self.assertVectors(single ^ self.array, [single ^ a for a in self.vectors])
+        np.testing.assert_allclose(single * self.array, [single * a for a in self.vectors])
+
+    def test_per_row_scaling(self):
+        self.assertVectors(self.array * np.array([1, 2, 3]), [a * k for a, k in zip(self.vectors, [1, 2, 3])])
+
+    def test_indexing(self):
+        self.assertEqual(self.array[1], self.vectors[1])
+        self.assertEqual(list(self.array), self.vectors)
+        self.assertEqual(len(self.array[1:]), 2)
+
+    def test_type_error(self):
+        with self.assertRaises(TypeError):
+            self.array + 1
+
+    def test_cross_scalar(self):
+        a, b = coord.Vector3D(57, 38, 49), coord.Vector3D(14, 33, 50)
+        np.testing.assert_array_equal((a ^ b).as_numpy_vector(), np.cross(a.as_numpy_vector(), b.as_numpy_vector()))
+
+    def test_slots_and_pickle(self):
+        import pickle
+        vector = coord.Vector3D(1.5, -2, 3)
+        with self.assertRaises(AttributeError):
+            vector.w = 0
+        self.assertEqual(pickle.loads(pickle.dumps(vector)), vector)
+        # State of vectors pickled before __slots__
+        restored = coord.Vector3D.__new__(coord.Vector3D)
+        restored.__setstate__({'x': 1.5, 'y': -2, 'z': 3})
+        self.assertEqual(restored, vector)
+
+
+class CaseObserverGeometry(unittest.TestCase):
+    def setUp(self):
+        self.geometry = observer.ObserverGeometry(coord.Vector3D.from_WGS84(48.373, 17.274, 531), 5)
+        self.points = [coord.Vector3D.from_WGS84(48 + 0.3 * i, 17.5 - 0.2 * i, 100000 - 5000 * i) for i in range(6)]
+        self.velocities = [coord.Vector3D(1000 * i, -20000, -30000 + 500 * i) for i in range(6)]
+
+    def test_matches_scalar(self):
+        view = self.geometry.observe(
+            coord.Vector3DArray.from_vectors(self.points).data, coord.Vector3DArray.from_vectors(self.velocities).data
+        )
+        for i, (point, velocity) in enumerate(zip(self.points, self.velocities)):
+            local = coord.Vector3D.from_numpy_vector(self.geometry.matrix @ (point - self.geometry.position).as_numpy_vector())
+            spherical = local.to_spherical()
+            self.assertAlmostEqual(view.altitude[i], spherical.lat, delta=1e-9)
+            self.assertAlmostEqual(view.azimuth[i], spherical.lon, delta=1e-9)
+            self.assertAlmostEqual(view.distance[i], spherical.alt, delta=1e-6)
+
+            relative = point - self.geometry.position
+            self.assertAlmostEqual(view.range_rate[i], relative * velocity / relative.norm(), delta=1e-9)
+            rejection = velocity - (relative * velocity) / relative.norm()**2 * relative
+            self.assertAlmostEqual(view.angular_speed[i], math.degrees(rejection.norm() / relative.norm()), delta=1e-12)
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.geometry.horizon = 0
+        with self.assertRaises(ValueError):
+            self.geometry.matrix[0, 0] = 0
+
+    def test_pickle(self):
+        import pickle
+        restored = pickle.loads(pickle.dumps(self.geometry))
+        self.assertEqual(restored.horizon, 5)
+        np.testing.assert_array_equal(restored.matrix, self.geometry.matrix)
+
+    def test_rotation_matrix_cached(self):
+        import functools
+        location = coord.Vector3D.from_geodetic(48.352, 17.313, 531)
+        self.assertIs(location.rotation_matrix(), location.rotation_matrix())
+        spherical = location.to_spherical()
+        expected = functools.reduce(np.dot, [
+            coord.rot_matrix_z(spherical.lon), coord.rot_matrix_y(spherical.lat), np.fliplr(np.eye(3))
+        ])
+        np.testing.assert_array_equal(location.rotation_matrix(), expected)
+        np.testing.assert_allclose(location.derotation_matrix() @ expected, np.eye(3), atol=1e-15)
+
+
 class CaseVector3DFormatting(unittest.TestCase):
     def setUp(self):
         self.vector = coord.Vector3D.from_geodetic(0, 0, 0)
@@ -203,6 +658,88 @@ class CaseVector3DFormatting(unittest.TestCase):
         )
 
 
+class CaseWGS84Array(unittest.TestCase):
+    def setUp(self):
+        self.points = [coord.Vector3D.from_WGS84(lat, lon, alt) for lat, lon, alt in
+                       [(48.2, 17.1, 120000), (-89.9, -170, 0), (0, 90, -500), (45.3, 0, 85000), (90, 0, 10)]]
+        self.x, self.y, self.z = np.array([(p.x, p.y, p.z) for p in self.points]).T
+
+    def test_matches_scalar(self):
+        for function in [coord.ecef_to_wgs84_array, coord.ecef_to_wgs84_array_numpy]:
+            lat, lon, alt = function(self.x, self.y, self.z)
+            for i, point in enumerate(self.points):
+                expected = point.to_WGS84()
+                self.assertAlmostEqual(lat[i], expected.lat, delta=1e-9)
+                self.assertAlmostEqual(lon[i], expected.lon, delta=1e-9)
+                self.assertAlmostEqual(alt[i], expected.alt, delta=1e-6)
+
+    def test_roundtrip(self):
+        for function in [coord.wgs84_to_ecef_array, coord.wgs84_to_ecef_array_numpy]:
+            x, y, z = function(*coord.ecef_to_wgs84_array(self.x, self.y, self.z))
+            np.testing.assert_allclose(np.stack((x, y, z)), np.stack((self.x, self.y, self.z)), atol=1e-6)
+
+    def test_shape(self):
+        lat, lon, alt = coord.ecef_to_wgs84_array(self.x.reshape(5, 1), self.y.reshape(5, 1), np.tile(self.z.reshape(5, 1), (1, 3)))
+        self.assertEqual(alt.shape, (5, 3))
+
+    def test_centre(self):
+        self.assertTrue(np.isnan(coord.ecef_to_wgs84_array([0.0], [0.0], [0.0])[2][0]))
+
+
+class CaseGeodeticTracker(unittest.TestCase):
+    def test_path(self):
+        tracker = coord.GeodeticTracker(refresh=1000)
+        for step in range(200):
+            point = coord.Vector3D.from_WGS84(48 - step * 0.05, 17 + step * 0.02, 130000 - step * 600)
+            latitude, altitude = tracker(point.x, point.y, point.z)
+            exact = point.to_WGS84()
+            self.assertAlmostEqual(latitude, exact.lat, delta=1e-6)
+            self.assertAlmostEqual(altitude, exact.alt, delta=1e-6)
+
+    def test_flight(self):
+        exact, tracked = make_meteor(speed=30000), make_meteor(speed=30000)
+        tracked.track_altitude(refresh=16)
+        exact.fly_constant(20, 4, method='RK4')
+        tracked.fly_constant(20, 4, method='RK4')
+        self.assertEqual(len(exact.frames), len(tracked.frames))
+        self.assertAlmostEqual((exact.position - tracked.position).norm(), 0, delta=1e-4)
+        self.assertAlmostEqual(exact.log_mass, tracked.log_mass, delta=1e-9)
+
+
+class CaseTime(unittest.TestCase):
+    def setUp(self):
+        self.times = [datetime.datetime(year, month, 12, 3, 4, 5, 678901) for year in (1995, 2016, 2024) for month in (1, 6, 11)]
+
+    def test_julian_date_inputs(self):
+        from astropy.time import Time
+        expected = Time(self.times).jd
+        np.testing.assert_allclose(coord.julian_date(self.times), expected, rtol=0, atol=1e-9)
+        np.testing.assert_allclose(coord.julian_date(np.array(self.times, dtype='datetime64[us]')), expected, rtol=0, atol=1e-9)
+        np.testing.assert_allclose(coord.julian_date(expected), expected, rtol=0, atol=1e-9)
+        self.assertAlmostEqual(coord.julian_date(self.times[0]), expected[0], delta=1e-9)
+        aware = self.times[0].replace(tzinfo=datetime.timezone(datetime.timedelta(hours=2)))
+        self.assertAlmostEqual(coord.julian_date(aware), expected[0] - 2 / 24, delta=1e-9)
+
+    def test_sidereal_time(self):
+        from astropy.time import Time
+        expected = Time(self.times).sidereal_time('mean', 'greenwich').deg
+        difference = (coord.greenwich_mean_sidereal_time(self.times) - expected + 180) % 360 - 180
+        self.assertLess(np.max(np.abs(difference)), 15 / 3600)
+
+    def test_rotation_angle_scalar(self):
+        self.assertEqual(coord.earth_rotation_angle(self.times[4]), coord.earth_rotation_angle(self.times)[4])
+
+    def test_sun(self):
+        from astropy.time import Time
+        from astropy.coordinates import get_sun, TETE
+        time = Time(self.times)
+        expected = get_sun(time).transform_to(TETE(obstime=time))
+        ra, dec, distance = coord.sun_position(self.times)
+        self.assertLess(np.max(np.abs((ra - expected.ra.deg + 180) % 360 - 180)), 0.01)
+        self.assertLess(np.max(np.abs(dec - expected.dec.deg)), 0.01)
+        np.testing.assert_allclose(distance, expected.distance.m, rtol=1e-4)
+
+
 class CaseEarthLocation(unittest.TestCase):
     def setUp(self):
         self.el = coord.EarthLocation.from_geodetic(48.313525, 17.315423, 531)
@@ -116,6 +116,8 @@ WGS84 ecef_to_wgs84(double x, double y, double z) {
     H = 2 * p * p * p + G;
     
     if (H < WGS84_HMIN) {
+       // Too close to the centre of the Earth, the conversion is undefined
+       geo.lat = geo.lon = geo.alt = NAN;
        return geo;
     }
    
@@ -157,3 +159,28 @@ WGS84 ecef_to_wgs84(double x, double y, double z) {
     geo.alt = (u < 1) ? -da : da;
     return geo;
 }
+
+/*****************************************************************************\
+|* Array versions, for NumPy buffers passed through ctypes (see physics/coord.py).
+|* Angles are in degrees on both sides, unlike the scalar wgs84_to_ecef.
+\*****************************************************************************/
+
+void ecef_to_wgs84_array(const double *x, const double *y, const double *z, double *lat, double *lon, double *alt, long n) {
+    WGS84 geo;
+    for (long j = 0; j < n; ++j) {
+        geo = ecef_to_wgs84(x[j], y[j], z[j]);
+        lat[j] = geo.lat;
+        lon[j] = geo.lon;
+        alt[j] = geo.alt;
+    }
+}
+
+void wgs84_to_ecef_array(const double *lat, const double *lon, const double *alt, double *x, double *y, double *z, long n) {
+    ECEF ecef;
+    for (long j = 0; j < n; ++j) {
+        ecef = wgs84_to_ecef(radians(lat[j]), radians(lon[j]), alt[j]);
+        x[j] = ecef.x;
+        y[j] = ecef.y;
+        z[j] = ecef.z;
+    }
+}
@@ -54,3 +54,6 @@ WGS84 ecef_to_geodetic(double x, double y, double z);
 
 ECEF spherical_to_ecef(double alt, double az, double dist);
 WGS84 ecef_to_spherical(double x, double y, double z);
+
+void ecef_to_wgs84_array(const double *x, const double *y, const double *z, double *lat, double *lon, double *alt, long n);
+void wgs84_to_ecef_array(const double *lat, const double *lon, const double *alt, double *x, double *y, double *z, long n);
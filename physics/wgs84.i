@@ -3,4 +3,9 @@
 #include "wgs84.h"
 %}
 
+// Array versions take raw buffers, they are built into the separate _wgs84_arrays library
+// and called through ctypes instead, see physics/setup.py and physics/coord.py
+%ignore ecef_to_wgs84_array;
+%ignore wgs84_to_ecef_array;
+
 %include "wgs84.h"
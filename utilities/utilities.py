@@ -1,4 +1,5 @@
 import argparse
+import math
 import os
 import sys
 import jinja2
@@ -83,3 +84,36 @@ def dict_product(**kwargs):
     
     for instance in itertools.product(*kwargs.values()):
         yield dict(zip(keys, instance))
+
+
+class DictGrid():
+    """
+        Cartesian product of named axes with random access, in the same order as `dict_product`
+        (the last axis varies fastest). The i-th point is constructed directly by mixed-radix indexing,
+        so any point or slice of the grid is available without materialising the points before it.
+    """
+    def __init__(self, **axes):
+        self.axes = axes
+        self.size = math.prod(map(len, axes.values()))
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(f"Point {index} out of range for a grid of {self.size} points")
+
+        digits = []
+        for values in reversed(self.axes.values()):
+            index, digit = divmod(index, len(values))
+            digits.append(values[digit])
+        return dict(zip(self.axes.keys(), reversed(digits)))
+
+    def __iter__(self):
+        return (self[index] for index in range(self.size))
+
+    def shard(self, index, count):
+        """ Range of indices of the `index`-th of `count` contiguous, nearly equal slices """
+        return range(index * self.size // count, (index + 1) * self.size // count)